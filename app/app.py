@@ -1,46 +1,78 @@
 import pygame
+from typing import Dict, List
 from app.pygame_ui.screens.placement_screen import PlacementScreen
 from app.pygame_ui.screens.game_screen import GameScreen
 from app.naval_battle.player_model import Player
 from app.pygame_ui.constants import WINDOW_WIDTH, WINDOW_HEIGHT
-from app.naval_battle.board_model import BoardModel
+from app.naval_battle.match_config import MatchConfig
 from app.pygame_ui.ui_core.screen_manager import ScreenManager
+from app.pygame_ui.ui_core import theme
+from app.pygame_ui.ui_core.frame_pacer import FramePacer
 from multiprocessing import Process, Queue
 from app.pygame_ui.run_players_screen import run_players_window
-from app.network.p2p_udp import UdpPeer
-from app.network.p2p_tcp import TcpPeer
+from app.network.p2p_udp import DEFAULT_UDP_PORT, UdpPeer
+from app.network.p2p_tcp import DEFAULT_TCP_PORT, TcpPeer
+from app.network.network_engine import NetworkEngine, EVENT_PARTICIPANTS
+from app.network.participants import PLAYERS_DELTA, PLAYERS_SNAPSHOT, diff_participants
+from app.network.shared_players import SharedPlayersTable
 
 class App:
-    def __init__(self):
+    def __init__(self, bind_addr: str | None = None, udp_port: int = DEFAULT_UDP_PORT,
+                 tcp_port: int = DEFAULT_TCP_PORT, discovery_targets: List[str] | None = None,
+                 match_config: MatchConfig | None = None):
         pygame.init()
         self.surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Batalha Naval - p2p")
-        self.clock = pygame.time.Clock()
+        # Ritmo adaptativo: 60 fps com interação, baixo quando ocioso; rede e entrada acordam o loop
+        self.pacer = FramePacer()
         self.running = True
 
-        self.board = BoardModel()
+        # Tamanho do tabuleiro e frota desta partida (anunciados aos outros jogadores no hello)
+        self.match_config = match_config or MatchConfig()
+        self.board = self.match_config.new_board()
         placement = PlacementScreen(board=self.board, on_start_game=self.on_start_game)
         self.manager = ScreenManager(placement, "PlacementScreen")
 
         # Processo da segunda janela (lista de jogadores)
         self.players_proc: Process | None = None
         self.players_queue: Queue | None = None
+        # Estado (ip -> ativo) e versão do registro já enviados à janela de jogadores
+        self.players_sent: Dict[str, bool] = {}
+        self.players_version_sent: int = -1
+        self.players_scores_sent: Dict[str, int] = {}
+        # Tabela em memória compartilhada lida diretamente pela janela (fila fica como alternativa)
+        self.players_table: SharedPlayersTable | None = None
 
         # Network
         self.udp_peer = None
         self.tcp_peer = None
+        self.network: NetworkEngine | None = None
+        # Interface de rede explícita (None = detectar automaticamente)
+        self.bind_addr = bind_addr
+        # Portas próprias (0 = escolhidas pelo sistema) e alvos unicast de descoberta (modo loopback)
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.discovery_targets = discovery_targets
         
     def on_start_game(self) -> None:
         # Configure UDP Peer (robust to errors to avoid blocking screen change)
         try:
-            self.tcp_peer = TcpPeer()
+            self.tcp_peer = TcpPeer(tcp_port=self.tcp_port, bind_addr=self.bind_addr)
 
-            self.udp_peer = UdpPeer(tcp_peer=self.tcp_peer)
-            self.udp_peer.send_broadcast_connecting()
+            self.udp_peer = UdpPeer(udp_port=self.udp_port, tcp_peer=self.tcp_peer, recv_buffer_size=1 << 20,
+                                    bind_addr=self.bind_addr, discovery_targets=self.discovery_targets,
+                                    match_config=self.match_config)
+
+            # Thread de rede: é dona dos sockets a partir daqui
+            self.network = NetworkEngine(self.udp_peer, self.tcp_peer)
+            self.network.on_events = self.pacer.wake
+            self.network.start()
+            self.network.send_broadcast_connecting()
 
         except Exception as e:
             print(f"[App] UDP peer initialization failed: {e}")
             self.udp_peer = None
+            self.network = None
 
         # Create and switch to GameScreen
         try:
@@ -48,7 +80,7 @@ class App:
                 my_board=self.board,
                 on_exit_game=self.on_exit_game,
                 players_count_provider=self.get_players_count,
-                udp_peer=self.udp_peer,
+                network=self.network,
             )
             self.manager.set_screen(game, "GameScreen")
             print("[App] Switched to GameScreen.")
@@ -60,84 +92,134 @@ class App:
             initial_players = self.udp_peer.get_participants() if self.udp_peer else []
             local_ip = self.udp_peer.get_local_ip() if self.udp_peer else ""
             self.players_queue = Queue()
-            self.players_proc = Process(target=run_players_window, args=(initial_players, local_ip, self.players_queue), daemon=True)
+            try:
+                self.players_table = SharedPlayersTable.create()
+            except Exception as e:
+                print(f"[App] Shared memory unavailable, using queue for players window: {e}")
+                self.players_table = None
+            table_name = self.players_table.name if self.players_table else None
+            self.players_proc = Process(target=run_players_window, args=(initial_players, local_ip, self.players_queue, table_name), daemon=True)
             self.players_proc.start()
             # envia snapshot inicial para a janela
-            if self.players_queue is not None:
-                try:
-                    self.players_queue.put(initial_players)
-                except Exception:
-                    pass
+            self.publish_players(resync=True)
         except Exception as e:
             print(f"[App] Failed to start players window process: {e}")
             self.players_proc = None
    
 
     def on_exit_game(self) -> None:
+        print(f"[App] Text cache: {theme.text_cache.stats()}")
+        print(f"[App] Shape cache: {theme.shape_cache.stats()}")
         # Avisa saída via UDP
-        if self.udp_peer:
+        if self.network:
             try:
-                self.udp_peer.send_broadcast_leaving()
+                self.network.send_broadcast_leaving()
             except Exception:
                 pass
+            # Envia o que estiver pendente e fecha as conexões TCP persistentes do pool
+            self.network.stop()
 
         # Encerra janela de jogadores se estiver ativa
        
         if self.players_proc and self.players_proc.is_alive():
             self.players_proc.terminate()
             self.players_proc.join(timeout=1.0)
+        if self.players_table is not None:
+            self.players_table.close()
+            self.players_table = None
        
     def get_players_count(self) -> int:
-        participants = self.udp_peer.get_participants()
-        return len(participants)
+        if self.udp_peer is None:
+            return 0
+        return self.udp_peer.get_participants_count()
 
     def run(self) -> None:
         while self.running:
+            events = self.pacer.wait()
             if self.manager.current_name == "GameScreen":
                 self.handle_network()
-            self.handle_ui()
+            self.handle_ui(events)
 
         pygame.quit()
 
     def handle_network(self) -> None:
-        self.players_queue.put(self.udp_peer.get_participants())
-
-        conn, addr_tcp, msg_tcp = self.tcp_peer.wait_for_connection()
-        addr_udp, msg_udp = self.udp_peer.wait_for_message()
-
-        if addr_udp and msg_udp:
-            self.manager.current.handle_network_event(addr_udp, msg_udp)
+        self.publish_players()
+
+        # Drena em lote todos os eventos que a thread de rede recebeu desde o último frame
+        if self.network is None:
+            return
+        for kind, addr, msg in self.network.poll_events():
+            if kind != EVENT_PARTICIPANTS:
+                self.manager.current.handle_network_event(addr, msg)
+
+    def publish_players(self, resync: bool = False) -> None:
+        # Envia à janela de jogadores apenas o que mudou desde o último envio
+        if self.players_queue is None or self.udp_peer is None:
+            return
+        version = self.udp_peer.get_participants_version()
+        engine = getattr(self.manager.current, "engine", None)
+        scores = dict(engine.hits_by_player) if engine is not None else {}
+        if not resync and version == self.players_version_sent and scores == self.players_scores_sent:
+            return
+        self.players_scores_sent = scores
+
+        if self.players_table is not None:
+            self.players_table.write(
+                (p.ip, p.active, scores.get(p.ip, 0), p.last_seen) for p in self.udp_peer.get_participants()
+            )
+            self.players_version_sent = version
+            return
 
-        if msg_tcp and addr_tcp:
-            if msg_tcp.lower().startswith("participantes:"):
-                self.udp_peer.receive_participant_list(msg_tcp)
-                self.players_queue.put(self.udp_peer.get_participants())
-                
+        if version == self.players_version_sent and not resync:
+            return
+        states = self.udp_peer.get_participant_states()
+        try:
+            if resync:
+                self.players_queue.put((PLAYERS_SNAPSHOT, list(states.items())))
             else:
-                self.manager.current.handle_network_event(addr_tcp, msg_tcp)
+                deltas = diff_participants(self.players_sent, states)
+                if deltas:
+                    self.players_queue.put((PLAYERS_DELTA, deltas))
+        except Exception as e:
+            print(f"[App] Failed to publish players update: {e}")
+            return
+        self.players_sent = states
+        self.players_version_sent = version
 
-    def handle_ui(self) -> None:
+    def handle_ui(self, events: List[pygame.event.Event]) -> None:
         # Event handling
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                # Conteúdo da janela perdido: próximo frame redesenha tudo
+                self.manager.invalidate()
             else:
                 self.manager.current.handle_event(event)
 
         # Update (dt em segundos)
-        dt = self.clock.tick(60) / 1000.0
+        dt = self.pacer.dt
         try:
             self.manager.current.update(dt)
         except Exception:
             pass
 
-        # Render
+        # Render: só quando algo mudou, e só as regiões sujas vão para a janela
+        try:
+            rects = self.manager.dirty_rects()
+        except Exception:
+            rects = None
+        if rects is not None and not rects:
+            return
         try:
             self.manager.current.render(self.surface)
         except Exception:
             pass
 
-        pygame.display.flip()
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
 
 def main() -> None:
     app = App()
@@ -0,0 +1,128 @@
+import time
+from typing import List, Optional
+from app.naval_battle.match_config import MatchConfig
+from app.naval_battle.game_engine import GameEngine
+from app.network import codec, interfaces
+from app.network.codec import Message
+from app.network.network_engine import NetworkEngine, EVENT_PARTICIPANTS
+from app.network.p2p_tcp import DEFAULT_TCP_PORT, TcpPeer
+from app.network.p2p_udp import DEFAULT_UDP_PORT, UdpPeer
+
+class HeadlessPeer:
+    # Jogador sem janela (bots/servidores): tabuleiro aleatório, GameEngine em modo de tiros automáticos
+    # e o protocolo UDP/TCP. Não importa pygame; vários peers podem rodar no mesmo processo (modo loopback).
+    def __init__(self, bind_addr: Optional[str] = None, udp_port: int = DEFAULT_UDP_PORT,
+                 tcp_port: int = DEFAULT_TCP_PORT, discovery_targets: Optional[List[str]] = None,
+                 shot_interval: float = 10.0, seed: Optional[int] = None,
+                 match_config: Optional[MatchConfig] = None) -> None:
+        self.bind_addr = bind_addr
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.discovery_targets = discovery_targets
+
+        self.match_config = match_config or MatchConfig()
+        self.board = self.match_config.new_board()
+        self.board.randomize(seed)
+        self.engine = GameEngine(self.board, countdown_total=shot_interval, seed=seed)
+        self.engine.set_random_shots(True)
+        self.last_step: Optional[float] = None
+        # Versão do registro de participantes já repassada ao motor (oponentes)
+        self.participants_version = -1
+
+        self.network: Optional[NetworkEngine] = None
+
+    def start(self) -> None:
+        tcp_peer = TcpPeer(tcp_port=self.tcp_port, bind_addr=self.bind_addr)
+        udp_peer = UdpPeer(udp_port=self.udp_port, tcp_peer=tcp_peer, bind_addr=self.bind_addr,
+                           discovery_targets=self.discovery_targets, match_config=self.match_config)
+        self.network = NetworkEngine(udp_peer, tcp_peer)
+        self.network.start()
+        self.network.send_broadcast_connecting()
+        self.last_step = time.monotonic()
+
+    def stop(self) -> None:
+        if self.network is None:
+            return
+        self.network.send_broadcast_leaving()
+        self.network.stop()
+        self.network = None
+
+    @property
+    def local_ip(self) -> str:
+        return self.network.get_local_ip() if self.network else (self.bind_addr or "")
+
+    def step(self, now: float) -> None:
+        if self.network is None:
+            return
+        for kind, addr, message in self.network.poll_events():
+            if kind != EVENT_PARTICIPANTS:
+                self.handle_network_event(addr, message)
+        version = self.network.get_participants_version()
+        if version != self.participants_version:
+            self.participants_version = version
+            self.engine.set_opponents(self.network.get_opponent_fleets())
+        dt = now - self.last_step
+        self.last_step = now
+        self.network.perform(self.engine.tick(dt, self.network.get_participants_count()))
+
+    def handle_network_event(self, addr, message: Message) -> None:
+        if message.kind == codec.MSG_SHOT:
+            self.network.perform(self.engine.on_shot(addr[0], message.x, message.y))
+        elif message.kind == codec.MSG_HIT:
+            self.network.perform(self.engine.on_hit(addr[0]))
+        elif message.kind == codec.MSG_DESTROYED:
+            self.network.perform(self.engine.on_destroyed(addr[0]))
+        elif message.kind == codec.MSG_LOST:
+            self.network.perform(self.engine.on_lost(addr[0]))
+
+
+def run_headless(bots: int = 1, bind_addr: Optional[str] = None, udp_port: int = DEFAULT_UDP_PORT,
+                 tcp_port: int = DEFAULT_TCP_PORT, discovery_targets: Optional[List[str]] = None,
+                 shot_interval: float = 10.0, duration: Optional[float] = None,
+                 seed: Optional[int] = None, match_config: Optional[MatchConfig] = None) -> List[HeadlessPeer]:
+    # Com mais de um bot, cada um fica num 127.0.0.k e a descoberta vai por unicast entre eles
+    if bots > 1:
+        addresses = interfaces.loopback_addresses(bots)
+        discovery_targets = discovery_targets or addresses
+    else:
+        addresses = [bind_addr]
+
+    peers: List[HeadlessPeer] = []
+    for i, addr in enumerate(addresses):
+        peer_seed = None if seed is None else seed + i
+        peers.append(HeadlessPeer(addr, udp_port, tcp_port, discovery_targets, shot_interval, peer_seed, match_config))
+
+    started = time.monotonic()
+    for peer in peers:
+        peer.start()
+    startup_ms = (time.monotonic() - started) * 1000
+    print(f"[Headless] {len(peers)} peer(s) up in {startup_ms:.1f} ms")
+
+    deadline = None if duration is None else time.monotonic() + duration
+    try:
+        while True:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            for peer in peers:
+                peer.step(now)
+            if len(peers) > 1 and sum(1 for p in peers if not p.engine.game_over) <= 1:
+                break
+            # Dorme até o próximo tiro, mas acorda periodicamente para tratar a rede
+            next_shot = min(p.engine.countdown_remaining for p in peers)
+            time.sleep(max(0.0, min(0.05, next_shot)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for peer in peers:
+            peer.stop()
+    return peers
+
+
+def print_report(peers: List[HeadlessPeer]) -> None:
+    for peer in peers:
+        engine = peer.engine
+        hits_received, _, destroyed, final_score = engine.compute_score()
+        status = "perdeu" if engine.game_over else "ativo"
+        print(f"[Headless] {peer.local_ip}: tiros={engine.shots_made} acertos={len(engine.shot_hits)} "
+              f"atingido={hits_received} destruídos={destroyed} score={final_score} ({status})")
@@ -0,0 +1,71 @@
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+Coord = Tuple[int, int]
+
+# Bitboards: um int do Python com um bit por célula, índice = y * largura + x.
+# Ocupação, navios e tiros viram máscaras; testes de acerto e de afundamento são operações de bits.
+
+
+def cell_bit(x: int, y: int, width: int) -> int:
+    return 1 << (y * width + x)
+
+
+def mask_from_cells(cells: Iterable[Coord], width: int) -> int:
+    mask = 0
+    for x, y in cells:
+        mask |= 1 << (y * width + x)
+    return mask
+
+
+def iter_cells(mask: int, width: int) -> Iterator[Coord]:
+    # Percorre só os bits ligados (menor primeiro)
+    while mask:
+        low = mask & -mask
+        index = low.bit_length() - 1
+        yield index % width, index // width
+        mask ^= low
+
+
+def cells_from_mask(mask: int, width: int) -> Set[Coord]:
+    return set(iter_cells(mask, width))
+
+
+def nth_cell(mask: int, k: int, width: int) -> Coord:
+    # k-ésimo bit ligado (0 = menor). Varre a representação binária em C em vez de
+    # descascar bit a bit, que em tabuleiros grandes copia o int inteiro a cada passo.
+    bits = bin(mask)[:1:-1]
+    index = -1
+    for _ in range(k + 1):
+        index = bits.index("1", index + 1)
+    return index % width, index // width
+
+
+def random_cell(mask: int, width: int, height: int, rnd) -> Optional[Coord]:
+    # Sorteia uma célula ligada: amostragem por rejeição enquanto a máscara está cheia,
+    # senão escolhe o k-ésimo bit
+    count = mask.bit_count()
+    if not count:
+        return None
+    total = width * height
+    if count * 4 >= total:
+        while True:
+            index = rnd.randrange(total)
+            if mask >> index & 1:
+                return index % width, index // width
+    return nth_cell(mask, rnd.randrange(count), width)
+
+
+def full_mask(width: int, height: int) -> int:
+    return (1 << (width * height)) - 1
+
+
+def line_mask(x: int, y: int, length: int, horizontal: bool, width: int) -> int:
+    # Máscara de um navio de `length` células a partir de (x, y), sem checar limites
+    if horizontal:
+        return ((1 << length) - 1) << (y * width + x)
+    mask = 0
+    bit = 1 << (y * width + x)
+    for _ in range(length):
+        mask |= bit
+        bit <<= width
+    return mask
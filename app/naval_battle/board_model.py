@@ -3,58 +3,87 @@ from typing import Dict, List, Optional, Set, Tuple
 from app.pygame_ui.constants import GRID_SIZE, ORIENT_H, ORIENT_V
 from app.naval_battle.ships import SHIP_TYPES, ShipType
 from app.naval_battle.placement import Placement
+from app.naval_battle.bitboard import cell_bit, cells_from_mask, line_mask
+from app.naval_battle.fleet_layout import random_layout
 
 Coord = Tuple[int, int]
 
 class BoardModel:
-    def __init__(self):
+    def __init__(self, grid_size: int = GRID_SIZE, ship_types: Optional[List[ShipType]] = None):
         # UI state
         self.selected_ship_key: Optional[str] = None
         self.current_orient: str = ORIENT_H
-        self.grid_size: int = GRID_SIZE
+        self.grid_size: int = grid_size
 
         # Game variables
-        self.ship_types: List[ShipType] = SHIP_TYPES
+        self.ship_types: List[ShipType] = ship_types if ship_types is not None else SHIP_TYPES
+        self.ship_types_by_key: Dict[str, ShipType] = {t.key: t for t in self.ship_types}
         self.placements: Dict[str, Placement] = {}
+        # Bitboards: ocupação total e máscara de cada navio (bit = y * grid_size + x)
+        self.occupancy: int = 0
+        self.ship_masks: Dict[str, int] = {}
+        # Índice célula -> navio (lista plana, mesmo índice dos bitboards)
+        self.cell_owner: List[Optional[str]] = [None] * (self.grid_size * self.grid_size)
+        # Dano recebido: células atingidas, células restantes por navio e navios ainda flutuando
+        self.hit_mask: int = 0
+        self.ship_remaining: Dict[str, int] = {}
+        self.ships_afloat: int = 0
 
     def reset(self) -> None:
         self.placements.clear()
+        self.ship_masks.clear()
+        self.occupancy = 0
+        self.cell_owner = [None] * (self.grid_size * self.grid_size)
+        self.hit_mask = 0
+        self.ship_remaining.clear()
+        self.ships_afloat = 0
 
     def all_placed(self) -> bool:
         keys_needed = {t.key for t in self.ship_types}
         return keys_needed.issubset(set(self.placements.keys()))
 
     def get_ship_type(self, key: str) -> Optional[ShipType]:
-        for t in self.ship_types:
-            if t.key == key:
-                return t
-        return None
+        return self.ship_types_by_key.get(key)
 
     def occupied(self) -> Set[Coord]:
-        occ: Set[Coord] = set()
-        for pl in self.placements.values():
-            occ.update(pl.cells)
-        return occ
+        return cells_from_mask(self.occupancy, self.grid_size)
+
+    def ship_at(self, x: int, y: int) -> Optional[str]:
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return None
+        return self.cell_owner[y * self.grid_size + x]
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return False
+        return bool(self.occupancy & cell_bit(x, y, self.grid_size))
 
     def can_place(self, key: str, start_x: int, start_y: int, orient: Optional[str] = None) -> Tuple[bool, Set[Coord]]:
         st = self.get_ship_type(key)
         if st is None:
             return False, set()
         orient = orient or self.current_orient
-        cells: Set[Coord] = set()
-        for i in range(st.size):
-            x = start_x + (i if orient == ORIENT_H else 0)
-            y = start_y + (0 if orient == ORIENT_H else i)
-            if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
-                return False, set()
-            cells.add((x, y))
+        ok, mask = self.ship_mask(st.size, start_x, start_y, orient)
+        if not ok:
+            return False, set()
         # Overlap: allow overlap with own current cells (reposition)
-        occ = self.occupied()
-        own_cells = self.placements.get(key).cells if key in self.placements else set()
-        for c in cells:
-            if c in occ and c not in own_cells:
-                return False, set()
-        return True, cells
+        if mask & (self.occupancy & ~self.ship_masks.get(key, 0)):
+            return False, set()
+        return True, self.line_cells(st.size, start_x, start_y, orient)
+
+    def ship_mask(self, size: int, start_x: int, start_y: int, orient: str) -> Tuple[bool, int]:
+        horizontal = orient == ORIENT_H
+        end_x = start_x + (size - 1 if horizontal else 0)
+        end_y = start_y + (0 if horizontal else size - 1)
+        if not (0 <= start_x and 0 <= start_y and end_x < self.grid_size and end_y < self.grid_size):
+            return False, 0
+        return True, line_mask(start_x, start_y, size, horizontal, self.grid_size)
+
+    @staticmethod
+    def line_cells(size: int, start_x: int, start_y: int, orient: str) -> Set[Coord]:
+        if orient == ORIENT_H:
+            return {(start_x + i, start_y) for i in range(size)}
+        return {(start_x, start_y + i) for i in range(size)}
 
     def place_ship(self, key: str, start_x: int, start_y: int, orient: Optional[str] = None) -> bool:
         st = self.get_ship_type(key)
@@ -64,43 +93,71 @@ class BoardModel:
         ok, cells = self.can_place(key, start_x, start_y, orient)
         if not ok:
             return False
-        self.placements[key] = Placement(
-            key=key,
+        _, mask = self.ship_mask(st.size, start_x, start_y, orient)
+        if key in self.placements:
+            self.unindex_ship(key)
+        self.index_ship(st, start_x, start_y, orient, mask, cells)
+        return True
+
+    def index_ship(self, st: ShipType, start_x: int, start_y: int, orient: str, mask: int, cells: Set[Coord]) -> None:
+        # Registra um navio numa posição já validada (máscara, índice de células e contadores)
+        self.occupancy |= mask
+        self.ship_masks[st.key] = mask
+        for cx, cy in cells:
+            self.cell_owner[cy * self.grid_size + cx] = st.key
+        self.ship_remaining[st.key] = st.size
+        self.ships_afloat += 1
+        self.placements[st.key] = Placement(
+            key=st.key,
             name=st.name,
             size=st.size,
             start=(start_x, start_y),
             orient=orient,
             cells=cells,
         )
-        return True
 
     def remove_ship_at(self, x: int, y: int) -> Optional[str]:
-        for key, pl in list(self.placements.items()):
-            if (x, y) in pl.cells:
-                del self.placements[key]
-                return key
-        return None
+        key = self.ship_at(x, y)
+        if key is None:
+            return None
+        self.unindex_ship(key)
+        del self.placements[key]
+        return key
+
+    def unindex_ship(self, key: str) -> None:
+        # Desfaz máscara, índice de células e contadores de um navio já posicionado
+        mask = self.ship_masks.pop(key, 0)
+        self.occupancy &= ~mask
+        for cx, cy in self.placements[key].cells:
+            self.cell_owner[cy * self.grid_size + cx] = None
+        if self.ship_remaining.pop(key, 0) > 0:
+            self.ships_afloat -= 1
+
+    def receive_hit(self, x: int, y: int) -> Tuple[Optional[str], bool]:
+        # Registra um tiro recebido em (x, y): devolve (navio atingido, afundou agora)
+        key = self.ship_at(x, y)
+        if key is None:
+            return None, False
+        bit = cell_bit(x, y, self.grid_size)
+        if self.hit_mask & bit:
+            return key, False
+        self.hit_mask |= bit
+        self.ship_remaining[key] -= 1
+        if self.ship_remaining[key] > 0:
+            return key, False
+        self.ships_afloat -= 1
+        return key, True
+
+    def fleet_destroyed(self) -> bool:
+        return bool(self.placements) and self.ships_afloat == 0
 
     def randomize(self, seed: Optional[int] = None) -> None:
+        # Sorteia posições só entre as válidas (ver fleet_layout); mesma semente, mesma frota
         rnd = random.Random(seed)
         self.reset()
-        for st in self.ship_types:
-            placed = False
-            attempts = 0
-            while not placed and attempts < 5000:
-                orient = rnd.choice([ORIENT_H, ORIENT_V])
-                if orient == ORIENT_H:
-                    x = rnd.randint(0, self.grid_size - st.size)
-                    y = rnd.randint(0, self.grid_size - 1)
-                else:
-                    x = rnd.randint(0, self.grid_size - 1)
-                    y = rnd.randint(0, self.grid_size - st.size)
-                if self.place_ship(st.key, x, y, orient):
-                    placed = True
-                attempts += 1
-            if not placed:
-                self.reset()
-                return self.randomize(seed=rnd.randint(0, 1_000_000))
+        layout = random_layout([st.size for st in self.ship_types], self.grid_size, rnd)
+        for st, (x, y, orient, mask) in zip(self.ship_types, layout):
+            self.index_ship(st, x, y, orient, mask, self.line_cells(st.size, x, y, orient))
 
     def set_selected_ship(self, key: Optional[str]) -> None:
         self.selected_ship_key = key
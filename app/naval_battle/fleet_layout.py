@@ -0,0 +1,80 @@
+import random
+from functools import lru_cache
+from typing import List, Optional, Sequence, Set, Tuple
+from app.pygame_ui.constants import ORIENT_H, ORIENT_V
+from app.naval_battle.bitboard import line_mask
+
+# Posicionamento aleatório da frota por restrições: cada navio escolhe entre as posições válidas
+# (máscaras que não colidem com a ocupação atual) e, se algum navio ficar sem opção, volta ao
+# navio anterior e tenta outra posição dele (backtracking com pilha explícita, sem recursão).
+
+# (x, y, orientação, máscara)
+Position = Tuple[int, int, str, int]
+
+# Sorteios diretos antes de enumerar todas as posições livres (tabuleiro vazio: quase sempre basta um)
+PROBES = 8
+
+
+@lru_cache(maxsize=256)
+def candidate_positions(grid_size: int, size: int) -> Tuple[Position, ...]:
+    # Todas as posições de um navio de `size` células dentro do tabuleiro, independentes da ocupação
+    positions: List[Position] = []
+    for y in range(grid_size):
+        for x in range(grid_size - size + 1):
+            positions.append((x, y, ORIENT_H, line_mask(x, y, size, True, grid_size)))
+    if size > 1:
+        # Navio de uma célula: vertical repetiria as mesmas máscaras
+        for y in range(grid_size - size + 1):
+            for x in range(grid_size):
+                positions.append((x, y, ORIENT_V, line_mask(x, y, size, False, grid_size)))
+    return tuple(positions)
+
+
+def random_layout(sizes: Sequence[int], grid_size: int, rnd: Optional[random.Random] = None) -> List[Position]:
+    # Devolve uma posição por navio, na mesma ordem de `sizes`; determinístico para o mesmo `rnd`
+    rnd = rnd or random.Random()
+    # Maiores primeiro: são os que têm menos posições livres
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+    chosen: List[Optional[Position]] = [None] * len(order)
+    # Alternativas ainda não tentadas por nível (None = ainda não enumeradas) e posições já descartadas
+    options: List[Optional[List[Position]]] = [None] * len(order)
+    failed: List[Set[int]] = [set() for _ in order]
+    occupancy = 0
+    level = 0
+    while level < len(order):
+        candidates = candidate_positions(grid_size, sizes[order[level]])
+        pick: Optional[Position] = None
+        if options[level] is None:
+            if not failed[level]:
+                for _ in range(PROBES):
+                    pos = candidates[rnd.randrange(len(candidates))]
+                    if not pos[3] & occupancy:
+                        pick = pos
+                        break
+            if pick is None:
+                options[level] = [p for p in candidates if not p[3] & occupancy and p[3] not in failed[level]]
+                rnd.shuffle(options[level])
+        if pick is None and options[level]:
+            pick = options[level].pop()
+
+        if pick is not None:
+            chosen[level] = pick
+            occupancy |= pick[3]
+            level += 1
+            continue
+
+        # Sem posição para este navio: desfaz o anterior e tenta outra posição dele
+        options[level] = None
+        failed[level].clear()
+        level -= 1
+        if level < 0:
+            raise ValueError("frota não cabe no tabuleiro")
+        previous = chosen[level]
+        occupancy &= ~previous[3]
+        failed[level].add(previous[3])
+        chosen[level] = None
+
+    layout: List[Optional[Position]] = [None] * len(sizes)
+    for level, index in enumerate(order):
+        layout[index] = chosen[level]
+    return layout
@@ -0,0 +1,296 @@
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+from app.naval_battle.board_model import BoardModel
+from app.naval_battle import bitboard
+from app.naval_battle.bitboard import cell_bit, cells_from_mask, full_mask, iter_cells
+import numpy as np
+from app.naval_battle.targeting import DensityField, Targeter, best_cell, update_fields
+
+Coord = Tuple[int, int]
+
+# Ações que o motor pede para a camada de rede executar
+OUT_SHOT = "shot"            # tiro em (x, y) para todos os participantes ativos
+OUT_HIT = "hit"              # avisa `ip` que o tiro dele acertou
+OUT_DESTROYED = "destroyed"  # avisa `ip` que o tiro dele afundou um navio
+OUT_LOST = "lost"            # avisa todos que perdemos
+
+
+@dataclass(frozen=True, slots=True)
+class Outgoing:
+    kind: str
+    ip: Optional[str] = None
+    x: int = 0
+    y: int = 0
+
+
+@dataclass(slots=True)
+class OpponentLedger:
+    # Nossos tiros contra um oponente: células disparadas enquanto ele estava no jogo e as que ele
+    # confirmou como acerto (dois ints por oponente). A mira só é criada no primeiro acerto.
+    fleet: Tuple[int, ...]
+    shot_mask: int = 0
+    hit_mask: int = 0
+    active: bool = True
+    lost: bool = False
+    targeter: Optional[Targeter] = None
+
+    @property
+    def miss_mask(self) -> int:
+        return self.shot_mask & ~self.hit_mask
+
+    def pending_hits(self) -> int:
+        # Acertos ainda não atribuídos a um navio afundado
+        resolved = self.targeter.resolved_mask if self.targeter else 0
+        return self.hit_mask & ~resolved
+
+
+class GameEngine:
+    # Estado autoritativo de uma partida, sem renderização nem sockets:
+    # eventos entram pelos métodos on_*/tick e as ações de rede saem como listas de Outgoing.
+    def __init__(self, my_board: BoardModel, countdown_total: float = 10.0, seed: Optional[int] = None) -> None:
+        self.my_board = my_board
+        self.grid_size = my_board.grid_size
+        self.rnd = random.Random(seed)
+
+        # Timer do ciclo de tiros
+        self.countdown_total = countdown_total
+        self.countdown_remaining = countdown_total
+
+        # Seleção de tiro e modo automático
+        self.selected_shot: Optional[Coord] = None
+        self.last_shot: Optional[Coord] = None
+        self.random_shots_enabled = False
+        # Prévia escolhida pelo modo automático (None se a seleção veio do jogador)
+        self.preview_shot: Optional[Coord] = None
+        # Frota assumida para oponentes que não anunciaram a sua (a nossa)
+        self.fleet: Tuple[int, ...] = tuple(st.size for st in my_board.ship_types)
+        # Densidade de caça sobre nossos tiros, atualizada só na linha e coluna de cada tiro novo
+        self.hunt_field = DensityField(self.grid_size, self.fleet)
+
+        # Tiros feitos e recebidos como bitboards (ver bitboard.py); os sets abaixo são só vistas para a UI.
+        # shot_mask: células em que atiramos; shot_hit_mask: acertadas em pelo menos um oponente
+        self.shot_mask = 0
+        self.shot_hit_mask = 0
+        self.incoming_miss_mask = 0
+        # Registro por oponente (ip -> tiros/acertos contra ele); hits_version muda a cada acerto novo
+        self.opponents: Dict[str, OpponentLedger] = {}
+        self.hits_version = 0
+        self.last_incoming_event: Optional[str] = None
+        self.sunk_ships_on_my_board: Set[str] = set()
+
+        # Placar
+        self.shots_made = 0
+        self.hits_received_count = 0
+        self.distinct_players_hit_count = 0
+        self.ships_destroyed_count = 0
+        self.hits_by_player: Dict[str, int] = {}
+        self.destroyed_ships_by_player: Dict[str, int] = {}
+
+        self.game_over = False
+
+    @property
+    def shot_miss_mask(self) -> int:
+        # Células que nenhum oponente confirmou como acerto
+        return self.shot_mask & ~self.shot_hit_mask
+
+    # Vistas em células (para desenhar)
+    @property
+    def shot_misses(self) -> Set[Coord]:
+        return cells_from_mask(self.shot_miss_mask, self.grid_size)
+
+    @property
+    def shot_hits(self) -> Set[Coord]:
+        return cells_from_mask(self.shot_hit_mask, self.grid_size)
+
+    @property
+    def incoming_shot_misses(self) -> Set[Coord]:
+        return cells_from_mask(self.incoming_miss_mask, self.grid_size)
+
+    @property
+    def incoming_shot_hits(self) -> Set[Coord]:
+        # Os acertos recebidos ficam no próprio tabuleiro (BoardModel.hit_mask)
+        return cells_from_mask(self.my_board.hit_mask, self.grid_size)
+
+    # Entrada do jogador local
+    def select_shot(self, coord: Optional[Coord]) -> None:
+        self.selected_shot = coord
+
+    def set_random_shots(self, enabled: bool) -> None:
+        self.random_shots_enabled = enabled
+        # Ao ligar, já mostra uma posição selecionada
+        if enabled and self.selected_shot is None:
+            self.selected_shot = self.preview_shot = self.next_target()
+
+    def random_cell(self) -> Optional[Coord]:
+        # Sorteia uma célula ainda não atingida por nós. Diferente da tela antiga (randint na grade toda,
+        # que podia repetir um tiro e perder o turno); é o último recurso de next_target e do disparo sem seleção
+        free = full_mask(self.grid_size, self.grid_size) & ~self.shot_mask
+        return bitboard.random_cell(free, self.grid_size, self.grid_size, self.rnd)
+
+    def next_target(self) -> Optional[Coord]:
+        # Alvo: soma as densidades dos oponentes com acertos pendentes (cada um com seus tiros e navios restantes).
+        # Os campos de todos eles são atualizados numa chamada só (uma linha e uma coluna por tiro novo),
+        # e a soma das partes horizontais e verticais é feita antes de uma única transposição.
+        pending = [o for o in self.opponents.values() if not o.lost and o.pending_hits()]
+        self.hunt_field.update(self.shot_mask, 0)
+        if pending:
+            targeters = [self.targeter_of(o) for o in pending]
+            fields = [t.field for t in targeters]
+            update_fields(fields, [t.masks(o.miss_mask, o.hit_mask) for t, o in zip(targeters, pending)])
+            rows = np.zeros_like(fields[0].rows)
+            cols = np.zeros_like(fields[0].cols)
+            for field in fields:
+                rows += field.rows
+                cols += field.cols
+            density = rows + cols.T
+            density[self.hunt_field.blocked] = 0
+            # Tudo zero (acertos que nenhum navio restante explica): cai na caça abaixo
+            cell = best_cell(density, self.rnd)
+            if cell is not None:
+                return cell
+        # Caça: todos os oponentes recebem os mesmos tiros, então uma densidade só basta
+        # (custo não cresce com o número de jogadores, e o mapa é reaproveitado até o próximo tiro)
+        cell = best_cell(self.hunt_field.density(), self.rnd)
+        return cell or self.random_cell()
+
+    # Oponentes
+    def set_opponents(self, fleets: Mapping[str, Sequence[int]]) -> None:
+        # Oponentes ativos agora (ip -> frota anunciada, vazia = desconhecida); os demais ficam inativos
+        for ip, ledger in self.opponents.items():
+            ledger.active = ip in fleets
+        for ip, fleet in fleets.items():
+            ledger = self.opponents.get(ip)
+            if ledger is None:
+                self.opponents[ip] = OpponentLedger(tuple(fleet) or self.fleet)
+            elif fleet and tuple(fleet) != ledger.fleet and ledger.targeter is None:
+                ledger.fleet = tuple(fleet)
+
+    def opponent(self, ip: str) -> OpponentLedger:
+        ledger = self.opponents.get(ip)
+        if ledger is None:
+            # Resposta de alguém que ainda não estava na lista: ao menos o último tiro chegou a ele
+            ledger = self.opponents[ip] = OpponentLedger(self.fleet)
+            if self.last_shot is not None:
+                ledger.shot_mask |= cell_bit(*self.last_shot, self.grid_size)
+        return ledger
+
+    def targeter_of(self, ledger: OpponentLedger) -> Targeter:
+        if ledger.targeter is None:
+            ledger.targeter = Targeter(self.grid_size, ledger.fleet)
+        return ledger.targeter
+
+    def hit_counts(self) -> Dict[Coord, int]:
+        # Mapa de calor: em quantos oponentes cada célula foi acerto
+        counts: Dict[Coord, int] = {}
+        for ledger in self.opponents.values():
+            for cell in iter_cells(ledger.hit_mask, self.grid_size):
+                counts[cell] = counts.get(cell, 0) + 1
+        return counts
+
+    def tick(self, dt: float, players_count: int) -> List[Outgoing]:
+        # Avança o timer; a cada ciclo completo dispara o tiro selecionado
+        if self.game_over or players_count < 2:
+            return []
+        self.countdown_remaining -= dt
+        if self.countdown_remaining > 0.0:
+            return []
+        out: List[Outgoing] = []
+        # A prévia foi escolhida antes das respostas (hit/destroyed/lost) do tiro anterior: escolhe de novo
+        # na hora de disparar, a menos que o jogador tenha clicado em outra célula
+        if self.random_shots_enabled and self.selected_shot in (None, self.preview_shot):
+            self.selected_shot = self.next_target()
+        if self.selected_shot is not None:
+            out = self.fire()
+        self.countdown_remaining = self.countdown_total
+        # Pré-seleciona a próxima posição apenas no modo automático (só para mostrar na UI)
+        self.preview_shot = None
+        if self.random_shots_enabled:
+            self.selected_shot = self.preview_shot = self.next_target()
+        return out
+
+    def fire(self) -> List[Outgoing]:
+        if self.selected_shot is None:
+            self.selected_shot = self.random_cell()
+            if self.selected_shot is None:
+                return []
+        self.last_shot = self.selected_shot
+        # Por padrão conta como miss em cada oponente; vira hit em quem responder "hit"
+        bit = cell_bit(*self.selected_shot, self.grid_size)
+        self.shot_mask |= bit
+        for ledger in self.opponents.values():
+            if ledger.active and not ledger.lost:
+                ledger.shot_mask |= bit
+        self.shots_made += 1
+        sx, sy = self.selected_shot
+        return [Outgoing(OUT_SHOT, x=sx, y=sy)]
+
+    # Eventos vindos da rede
+    def on_hit(self, ip: str) -> List[Outgoing]:
+        self.hits_by_player[ip] = self.hits_by_player.get(ip, 0) + 1
+        self.distinct_players_hit_count = len([p for p, c in self.hits_by_player.items() if c > 0])
+        if self.last_shot is not None:
+            bit = cell_bit(*self.last_shot, self.grid_size)
+            ledger = self.opponent(ip)
+            ledger.shot_mask |= bit
+            if not ledger.hit_mask & bit:
+                ledger.hit_mask |= bit
+                self.shot_hit_mask |= bit
+                self.hits_version += 1
+        return []
+
+    def on_destroyed(self, ip: str) -> List[Outgoing]:
+        self.destroyed_ships_by_player[ip] = self.destroyed_ships_by_player.get(ip, 0) + 1
+        # Navios inimigos afundados por nós (painel "Destruídos"). A tela antiga nunca incrementava
+        # este contador e o painel ficava sempre em 0; agora conta cada aviso "destroyed" recebido
+        self.ships_destroyed_count += 1
+        if self.last_shot is not None:
+            ledger = self.opponent(ip)
+            self.targeter_of(ledger).on_sunk(self.last_shot, ledger.hit_mask)
+        return []
+
+    def on_lost(self, ip: str) -> List[Outgoing]:
+        # Oponente sem navios: não recebe mais tiros nem entra na mira
+        self.opponent(ip).lost = True
+        return []
+
+    def on_shot(self, ip: str, x: int, y: int) -> List[Outgoing]:
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return []
+        ship_key, sunk = self.my_board.receive_hit(x, y)
+        if ship_key is None:
+            self.incoming_miss_mask |= cell_bit(x, y, self.grid_size)
+            return []
+
+        self.hits_received_count += 1
+        out = [Outgoing(OUT_HIT, ip)]
+
+        # Afundou: a última célula restante do navio foi atingida
+        if sunk:
+            self.sunk_ships_on_my_board.add(ship_key)
+            self.last_incoming_event = f"sunk:{ship_key}"
+            out.append(Outgoing(OUT_DESTROYED, ip))
+            out.extend(self.check_end_of_game())
+        return out
+
+    def check_end_of_game(self) -> List[Outgoing]:
+        if self.my_board.fleet_destroyed() and not self.game_over:
+            self.game_over = True
+            return [Outgoing(OUT_LOST)]
+        return []
+
+    # Consultas
+    def is_hit_on_my_board(self, x: int, y: int) -> bool:
+        return self.my_board.is_occupied(x, y)
+
+    def find_ship_key_at(self, x: int, y: int) -> Optional[str]:
+        return self.my_board.ship_at(x, y)
+
+    def compute_score(self) -> Tuple[int, Dict[str, int], int, int]:
+        # hits_received, hits_by_player, destroyed, final_score
+        hits_received = self.hits_received_count
+        hits_by_player = dict(self.hits_by_player)
+        distinct_players_hit = len([ip for ip, c in hits_by_player.items() if c > 0])
+        destroyed = len([ip for ip, c in self.destroyed_ships_by_player.items() if c > 0])
+        final_score = distinct_players_hit - hits_received
+        return hits_received, hits_by_player, destroyed, final_score
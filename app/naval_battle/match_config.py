@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+from app.pygame_ui.constants import GRID_SIZE, MAX_GRID_SIZE
+from app.naval_battle.board_model import BoardModel
+from app.naval_battle.ships import SHIP_SPECS, ShipType, fleet_specs, get_ship_types
+
+DEFAULT_FLEET: Tuple[int, ...] = tuple(size for _, size in SHIP_SPECS)
+
+
+class MatchConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class MatchConfig:
+    # Dimensão do tabuleiro (quadrado) e tamanhos dos navios da frota; anunciados no "hello"
+    grid_size: int = GRID_SIZE
+    fleet: Tuple[int, ...] = DEFAULT_FLEET
+
+    def __post_init__(self) -> None:
+        if not 2 <= self.grid_size <= MAX_GRID_SIZE:
+            raise MatchConfigError(f"tabuleiro deve ter entre 2 e {MAX_GRID_SIZE} células de lado")
+        if not self.fleet:
+            raise MatchConfigError("a frota precisa de pelo menos um navio")
+        if any(not 1 <= size <= self.grid_size for size in self.fleet):
+            raise MatchConfigError(f"navios devem ter entre 1 e {self.grid_size} células")
+        if sum(self.fleet) > self.grid_size * self.grid_size // 2:
+            raise MatchConfigError("a frota ocupa mais da metade do tabuleiro")
+
+    @classmethod
+    def parse(cls, grid_size: int, fleet: str = "") -> "MatchConfig":
+        # fleet: tamanhos separados por vírgula, ex.: "5,4,4,3,2"
+        if not fleet:
+            return cls(grid_size)
+        try:
+            sizes = tuple(int(part) for part in fleet.split(",") if part.strip())
+        except ValueError:
+            raise MatchConfigError(f"frota inválida: {fleet!r}")
+        return cls(grid_size, sizes)
+
+    def ship_types(self) -> List[ShipType]:
+        return get_ship_types(fleet_specs(self.fleet))
+
+    def new_board(self) -> BoardModel:
+        return BoardModel(self.grid_size, self.ship_types())
+
+    def describe(self) -> str:
+        return f"{self.grid_size}x{self.grid_size}, frota {','.join(map(str, self.fleet))}"
@@ -1,6 +1,21 @@
 from dataclasses import dataclass
+from typing import Tuple
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     ip: str
     active: bool = True
+    # time.monotonic() da última mensagem recebida deste jogador
+    last_seen: float = 0.0
+    # Acertos que fizemos neste jogador (exibido na janela de jogadores)
+    score: int = 0
+    # Portas anunciadas pelo jogador (0 = portas padrão)
+    udp_port: int = 0
+    tcp_port: int = 0
+    # Configuração de partida anunciada no "hello" (0/() = não anunciada)
+    grid_size: int = 0
+    fleet: Tuple[int, ...] = ()
+
+    def plays_on(self, grid_size: int) -> bool:
+        # Tabuleiro não anunciado (par legado ou hello ainda não chegou) conta como compatível
+        return not self.grid_size or self.grid_size == grid_size
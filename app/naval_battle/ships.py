@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from typing import List, Tuple
-from app.pygame_ui.ui_core import theme
+from typing import List, Sequence, Tuple
+from app.pygame_ui.constants import SHIP_COLORS
 
 # Ship specs (name, size)
 SHIP_SPECS = [
@@ -18,14 +18,28 @@ class ShipType:
     color: Tuple[int, int, int]
 
 
-def get_ship_types() -> List[ShipType]:
+def get_ship_types(specs: Sequence[Tuple[str, int]] = SHIP_SPECS) -> List[ShipType]:
     types: List[ShipType] = []
-    for idx, (name, size) in enumerate(SHIP_SPECS):
-        color = theme.SHIP_COLORS[idx % len(theme.SHIP_COLORS)]
+    used_keys = set()
+    for idx, (name, size) in enumerate(specs):
+        color = SHIP_COLORS[idx % len(SHIP_COLORS)]
         key = name.lower().replace(" ", "_")
+        # Frotas personalizadas podem repetir nomes: a chave precisa ser única
+        if key in used_keys:
+            key = f"{key}_{idx + 1}"
+        used_keys.add(key)
         types.append(ShipType(key=key, name=name, size=size, color=color))
     return types
 
 
+def fleet_specs(sizes: Sequence[int]) -> List[Tuple[str, int]]:
+    # Nomes padrão para os tamanhos conhecidos; os demais viram "Navio N"
+    names_by_size = {size: name for name, size in SHIP_SPECS}
+    specs: List[Tuple[str, int]] = []
+    for size in sizes:
+        specs.append((names_by_size.get(size, f"Navio {size}"), size))
+    return specs
+
+
 # Lista padrão de tipos
 SHIP_TYPES: List[ShipType] = get_ship_types()
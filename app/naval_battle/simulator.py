@@ -0,0 +1,154 @@
+import argparse
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from app.naval_battle.match_config import MatchConfig, MatchConfigError
+from app.naval_battle.game_engine import GameEngine, Outgoing, OUT_SHOT, OUT_HIT, OUT_DESTROYED, OUT_LOST
+
+# Simulação determinística de partidas com N jogadores, sem sockets e com relógio virtual:
+# cada rodada avança countdown_total segundos de uma vez e as mensagens são entregues na hora.
+
+
+@dataclass
+class MatchResult:
+    seed: int
+    rounds: int
+    shots: int
+    virtual_seconds: float
+    winner: Optional[str]
+    scores: Dict[str, int] = field(default_factory=dict)
+    # Tempo real gasto em GameEngine.tick (na UI roda na thread da interface e inclui a escolha do alvo)
+    tick_seconds: List[float] = field(default_factory=list)
+
+
+@dataclass
+class SimulationReport:
+    players: int
+    games: int
+    elapsed: float
+    matches: List[MatchResult]
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def summary(self) -> str:
+        shots = [m.shots for m in self.matches]
+        rounds = [m.rounds for m in self.matches]
+        scores = [s for m in self.matches for s in m.scores.values()]
+        winner_scores = [m.scores[m.winner] for m in self.matches if m.winner is not None]
+        lines = [
+            f"partidas: {self.games} com {self.players} jogadores em {self.elapsed:.3f}s "
+            f"({self.games_per_second:.1f} partidas/s)",
+            f"tiros até o fim: média {statistics.mean(shots):.1f}, mín {min(shots)}, máx {max(shots)}",
+            f"rodadas: média {statistics.mean(rounds):.1f} "
+            f"(~{statistics.mean(m.virtual_seconds for m in self.matches) / 60:.1f} min de jogo real)",
+            f"score final: média {statistics.mean(scores):.2f}, desvio {statistics.pstdev(scores):.2f}, "
+            f"mín {min(scores)}, máx {max(scores)}",
+        ]
+        if winner_scores:
+            lines.append(f"score do vencedor: média {statistics.mean(winner_scores):.2f}")
+        histogram: Dict[int, int] = {}
+        for s in scores:
+            histogram[s] = histogram.get(s, 0) + 1
+        lines.append("distribuição: " + " ".join(f"{s}:{c}" for s, c in sorted(histogram.items())))
+        ticks = sorted(t * 1000 for m in self.matches for t in m.tick_seconds)
+        if ticks:
+            lines.append(f"tick do motor (com mira): média {statistics.mean(ticks):.3f} ms, "
+                         f"p99 {ticks[int(len(ticks) * 0.99)]:.3f} ms, máx {ticks[-1]:.3f} ms")
+        return "\n".join(lines)
+
+
+def make_players(players: int, seed: int, countdown_total: float,
+                 match_config: Optional[MatchConfig] = None) -> Dict[str, GameEngine]:
+    match_config = match_config or MatchConfig()
+    engines: Dict[str, GameEngine] = {}
+    for i in range(players):
+        # IPs fictícios só para identificar os jogadores no placar
+        ip = f"10.0.{i // 256}.{i % 256}"
+        board = match_config.new_board()
+        board.randomize(seed * players + i)
+        engine = GameEngine(board, countdown_total=countdown_total, seed=seed * players + i)
+        engines[ip] = engine
+    for ip, engine in engines.items():
+        engine.set_opponents({other: match_config.fleet for other in engines if other != ip})
+        engine.set_random_shots(True)
+    return engines
+
+
+def deliver(engines: Dict[str, GameEngine], sender: str, actions: List[Outgoing]) -> int:
+    # Entrega imediata das ações de `sender`; respostas (hit/destroyed) voltam na mesma chamada
+    shots = 0
+    for action in actions:
+        if action.kind == OUT_SHOT:
+            shots += 1
+            for ip, target in engines.items():
+                if ip != sender:
+                    deliver(engines, ip, target.on_shot(sender, action.x, action.y))
+        elif action.kind == OUT_HIT:
+            engines[action.ip].on_hit(sender)
+        elif action.kind == OUT_DESTROYED:
+            engines[action.ip].on_destroyed(sender)
+        elif action.kind == OUT_LOST:
+            for ip, target in engines.items():
+                if ip != sender:
+                    target.on_lost(sender)
+    return shots
+
+
+def play_match(players: int, seed: int, countdown_total: float = 10.0, max_rounds: int = 100_000,
+               match_config: Optional[MatchConfig] = None) -> MatchResult:
+    engines = make_players(players, seed, countdown_total, match_config)
+    rounds = 0
+    shots = 0
+    clock = 0.0
+    tick_seconds: List[float] = []
+    while rounds < max_rounds:
+        alive = [ip for ip, e in engines.items() if not e.game_over]
+        if len(alive) <= 1:
+            break
+        rounds += 1
+        clock += countdown_total
+        for ip in alive:
+            engine = engines[ip]
+            if engine.game_over:
+                continue
+            started = time.perf_counter()
+            actions = engine.tick(countdown_total, len(engines))
+            tick_seconds.append(time.perf_counter() - started)
+            shots += deliver(engines, ip, actions)
+    alive = [ip for ip, e in engines.items() if not e.game_over]
+    winner = alive[0] if len(alive) == 1 else None
+    scores = {ip: e.compute_score()[3] for ip, e in engines.items()}
+    return MatchResult(seed, rounds, shots, clock, winner, scores, tick_seconds)
+
+
+def simulate(players: int = 4, games: int = 100, seed: int = 0, countdown_total: float = 10.0,
+             match_config: Optional[MatchConfig] = None) -> SimulationReport:
+    started = time.perf_counter()
+    matches = [play_match(players, seed + g, countdown_total, match_config=match_config) for g in range(games)]
+    return SimulationReport(players, games, time.perf_counter() - started, matches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulador de partidas de Batalha Naval")
+    parser.add_argument("--players", type=int, default=4, help="jogadores por partida")
+    parser.add_argument("--games", type=int, default=100, help="quantidade de partidas")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida")
+    parser.add_argument("--countdown", type=float, default=10.0, help="segundos virtuais por rodada")
+    parser.add_argument("--grid-size", type=int, default=MatchConfig.grid_size, help="lado do tabuleiro (até 100)")
+    parser.add_argument("--fleet", default="", help="tamanhos dos navios separados por vírgula, ex.: 5,4,3,3,2")
+    args = parser.parse_args()
+    if args.players < 2:
+        parser.error("--players deve ser pelo menos 2")
+    try:
+        match_config = MatchConfig.parse(args.grid_size, args.fleet)
+    except MatchConfigError as e:
+        parser.error(str(e))
+    print(f"tabuleiro: {match_config.describe()}")
+    print(simulate(args.players, args.games, args.seed, args.countdown, match_config).summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import random
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from app.naval_battle.bitboard import cell_bit, iter_cells
+
+Coord = Tuple[int, int]
+# Quantidade de navios de um tamanho: a mesma para todas as linhas ou uma por linha (coluna (m, 1))
+LineCount = Union[int, np.ndarray]
+
+# Mira por densidade de probabilidade: para cada navio inimigo ainda flutuando, conta em quantas
+# posições possíveis (sem cruzar erros nem navios já afundados) cada célula aparece.
+# Caça (sem acertos pendentes): todas as posições contam. Alvo (após um "hit"): só contam as
+# posições que passam pelos acertos pendentes, com peso pelo número de acertos cobertos.
+
+# Peso extra por acerto coberto no modo alvo
+HIT_WEIGHT = 8
+
+
+def mask_to_array(mask: int, grid_size: int) -> np.ndarray:
+    # Bitboard (bit = y * grid_size + x) -> matriz booleana [y, x]
+    cells = grid_size * grid_size
+    raw = np.frombuffer(mask.to_bytes((cells + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:cells].reshape(grid_size, grid_size).astype(bool)
+
+
+def size_counts(sizes: Sequence[int]) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for size in sizes:
+        counts[size] = counts.get(size, 0) + 1
+    return counts
+
+
+def padded_cumsum(grid: np.ndarray) -> np.ndarray:
+    # Soma acumulada no último eixo com um zero à esquerda: janela [a, b) = cs[..., b] - cs[..., a]
+    padded = np.zeros(grid.shape[:-1] + (grid.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(grid, axis=-1, out=padded[..., 1:])
+    return padded
+
+
+@lru_cache(maxsize=64)
+def window_indices(length: int, sizes: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Índices [tamanho, x] compartilhados por todas as linhas: fim da janela que começa em x, se ela cabe,
+    # e o primeiro início cujo navio ainda cobre x
+    size_col = np.array(sizes)[:, None]
+    starts = np.arange(length)[None, :]
+    ends = np.minimum(starts + size_col, length)
+    fits = starts + size_col <= length
+    first = np.maximum(starts - size_col + 1, 0)
+    return ends, fits, first, np.arange(len(sizes))[:, None]
+
+
+def horizontal_density(blocked: np.ndarray, hits: Optional[np.ndarray], sizes: Dict[int, LineCount], target: bool) -> np.ndarray:
+    # Todos os tamanhos de uma vez, eixo [linha, tamanho, x]: uma janela é livre se não cobre bloqueio;
+    # a soma acumulada dos pesos pelos inícios dá, para cada célula, o peso das janelas que a cobrem.
+    # Cada linha só depende dela mesma; a quantidade de navios pode ser uma coluna (m, 1) por linha.
+    rows, cols = blocked.shape
+    fitting = tuple(size for size in sorted(sizes) if size <= cols)
+    if not fitting:
+        return np.zeros((rows, cols), dtype=np.int32)
+    ends, fits, first, size_index = window_indices(cols, fitting)
+    counts = [sizes[size] for size in fitting]
+    if all(isinstance(count, int) for count in counts):
+        weight = np.array(counts, dtype=np.int32)[:, None]
+    else:
+        weight = np.stack([np.broadcast_to(count, (rows, 1)) for count in counts], axis=1).astype(np.int32)
+
+    blocked_cs = padded_cumsum(blocked)
+    weights = ((blocked_cs[:, ends] == blocked_cs[:, None, :cols]) & fits) * weight
+    if target:
+        hits_cs = padded_cumsum(hits)
+        covered = hits_cs[:, ends] - hits_cs[:, None, :cols]
+        weights *= (covered > 0) * (1 + HIT_WEIGHT * covered)
+    weights_cs = padded_cumsum(weights)
+    return (weights_cs[:, :, 1:] - weights_cs[:, size_index, first]).sum(axis=1, dtype=np.int32)
+
+
+def placement_density(blocked: np.ndarray, hits: np.ndarray, sizes: Dict[int, int], target: bool) -> np.ndarray:
+    # Horizontais nas linhas e verticais nas linhas da transposta (navio de uma célula conta uma vez)
+    density = horizontal_density(blocked, hits, sizes, target)
+    vertical = {size: count for size, count in sizes.items() if size > 1}
+    density += horizontal_density(blocked.T, hits.T, vertical, target).T
+    return density
+
+
+def density_map(grid_size: int, sizes: Sequence[int], miss_mask: int, hit_mask: int,
+                resolved_mask: int = 0) -> np.ndarray:
+    # Densidade [y, x] calculada do zero para um tabuleiro inimigo; `resolved_mask` são acertos de
+    # navios já afundados. Para decisões repetidas use DensityField, que só refaz o que mudou.
+    blocked = mask_to_array(miss_mask | resolved_mask, grid_size)
+    hits = mask_to_array(hit_mask & ~resolved_mask, grid_size)
+    shot = mask_to_array(miss_mask | hit_mask, grid_size)
+    counts = size_counts(sizes)
+    target = bool(hits.any())
+    density = placement_density(blocked, hits, counts, target)
+    density[shot] = 0
+    if target and not density.any():
+        # Acertos que nenhum navio restante explica (frota do oponente diferente da assumida): volta à caça
+        density = placement_density(blocked, hits, counts, False)
+        density[shot] = 0
+    return density
+
+
+class DensityField:
+    # Densidade de um tabuleiro mantida entre decisões. As posições horizontais de uma linha só
+    # dependem daquela linha (e as verticais, da coluna): um tiro novo refaz uma linha e uma coluna,
+    # não o tabuleiro inteiro. Bloqueios e acertos ficam em arrays atualizados célula a célula.
+    def __init__(self, grid_size: int, sizes: Sequence[int]) -> None:
+        n = grid_size
+        self.grid_size = n
+        self.counts = size_counts(sizes)
+        self.blocked_mask = 0
+        self.hits_mask = 0
+        self.target = False
+        self.blocked = np.zeros((n, n), dtype=bool)
+        self.hits = np.zeros((n, n), dtype=bool)
+        # Horizontais [y, x] e verticais transpostas [x, y]; `total` = soma com as células atiradas zeradas
+        self.rows = np.zeros((n, n), dtype=np.int32)
+        self.cols = np.zeros((n, n), dtype=np.int32)
+        self.total: Optional[np.ndarray] = None
+        self.refresh(range(n), range(n))
+
+    def set_sizes(self, sizes: Sequence[int]) -> None:
+        self.counts = size_counts(sizes)
+        self.refresh(*self.live_lines(range(self.grid_size), range(self.grid_size)))
+
+    def live_lines(self, rows: Sequence[int], cols: Sequence[int]) -> Tuple[List[int], List[int]]:
+        # Modo alvo: só linhas e colunas com acerto pendente têm posições válidas; as outras são
+        # zeradas aqui sem cálculo (ao entrar no modo alvo refaz-se uma ou duas linhas, não n)
+        rows, cols = list(rows), list(cols)
+        if not self.target:
+            return rows, cols
+        live_rows = self.hits.take(rows, 0).any(axis=1).tolist()
+        live_cols = self.hits.take(cols, 1).any(axis=0).tolist()
+        if not all(live_rows):
+            self.rows[[y for y, live in zip(rows, live_rows) if not live]] = 0
+        if not all(live_cols):
+            self.cols[[x for x, live in zip(cols, live_cols) if not live]] = 0
+        return [y for y, live in zip(rows, live_rows) if live], [x for x, live in zip(cols, live_cols) if live]
+
+    def stage(self, blocked_mask: int, hits_mask: int) -> Tuple[List[int], List[int]]:
+        # Aplica as máscaras novas aos arrays e devolve as linhas e colunas a recalcular
+        n = self.grid_size
+        target = hits_mask != 0
+        changed = (blocked_mask ^ self.blocked_mask) | (hits_mask ^ self.hits_mask)
+        if not changed and target == self.target:
+            return [], []
+        self.total = None
+        if target != self.target or changed.bit_count() > n:
+            # Mudou o modo (caça/alvo) ou muitas células de uma vez: refaz tudo
+            self.blocked = mask_to_array(blocked_mask, n)
+            self.hits = mask_to_array(hits_mask, n)
+            rows: Sequence[int] = range(n)
+            cols: Sequence[int] = range(n)
+        else:
+            row_set, col_set = set(), set()
+            for x, y in iter_cells(changed, n):
+                bit = y * n + x
+                self.blocked[y, x] = blocked_mask >> bit & 1
+                self.hits[y, x] = hits_mask >> bit & 1
+                row_set.add(y)
+                col_set.add(x)
+            rows, cols = sorted(row_set), sorted(col_set)
+        self.blocked_mask = blocked_mask
+        self.hits_mask = hits_mask
+        self.target = target
+        return self.live_lines(rows, cols)
+
+    def refresh(self, rows: Sequence[int], cols: Sequence[int]) -> None:
+        refresh_lines([(self, list(rows), list(cols))], self.target)
+
+    def update(self, blocked_mask: int, hits_mask: int) -> None:
+        self.refresh(*self.stage(blocked_mask, hits_mask))
+
+    def density(self) -> np.ndarray:
+        # Reaproveitada enquanto nada mudar; não alterar o array devolvido
+        if self.total is None:
+            total = self.rows + self.cols.T
+            total[self.blocked | self.hits] = 0
+            self.total = total
+        return self.total
+
+
+LineJob = Tuple[DensityField, List[int], List[int]]
+
+
+def refresh_lines(jobs: Sequence[LineJob], target: bool) -> None:
+    # Recalcula linhas e colunas (transpostas) de vários campos do mesmo modo numa única chamada:
+    # tudo é empilhado em (m, n), cada linha com as quantidades de navios do seu campo
+    jobs = [job for job in jobs if job[1] or job[2]]
+    if not jobs:
+        return
+    blocked_parts: List[np.ndarray] = []
+    hits_parts: List[np.ndarray] = []
+    for field, rows, cols in jobs:
+        blocked_parts += [field.blocked.take(rows, 0), field.blocked.take(cols, 1).T]
+        if target:
+            hits_parts += [field.hits.take(rows, 0), field.hits.take(cols, 1).T]
+    counts: Dict[int, LineCount] = {}
+    for size in set().union(*(field.counts for field, _, _ in jobs)):
+        # (quantidade, linhas) por trecho; navio de uma célula só conta nas linhas, não nas colunas
+        spans = []
+        for field, rows, cols in jobs:
+            count = field.counts.get(size, 0)
+            spans += [(count, len(rows)), (count if size > 1 else 0, len(cols))]
+        values = {count for count, length in spans if length}
+        if len(values) == 1:
+            counts[size] = values.pop()
+        else:
+            counts[size] = np.repeat([count for count, _ in spans], [length for _, length in spans])[:, None]
+    hits = np.concatenate(hits_parts) if target else None
+    lines = horizontal_density(np.concatenate(blocked_parts), hits, counts, target)
+    offset = 0
+    for field, rows, cols in jobs:
+        field.rows[rows] = lines[offset:offset + len(rows)]
+        offset += len(rows)
+        field.cols[cols] = lines[offset:offset + len(cols)]
+        offset += len(cols)
+        field.total = None
+
+
+def update_fields(fields: Sequence[DensityField], masks: Sequence[Tuple[int, int]]) -> None:
+    # Vários tabuleiros de uma vez (um campo por oponente): o custo por tiro fica em uma linha e uma
+    # coluna por campo, calculadas juntas, em vez de um mapa inteiro por oponente
+    jobs: Dict[bool, List[LineJob]] = {False: [], True: []}
+    for field, (blocked_mask, hits_mask) in zip(fields, masks):
+        rows, cols = field.stage(blocked_mask, hits_mask)
+        jobs[field.target].append((field, rows, cols))
+    for target, group in jobs.items():
+        refresh_lines(group, target)
+
+
+def best_cell(density: np.ndarray, rnd: random.Random) -> Optional[Coord]:
+    # Célula de maior densidade; empates sorteados com `rnd` (determinístico por semente)
+    top = density.max()
+    if top <= 0:
+        return None
+    candidates = np.flatnonzero(density == top)
+    index = int(candidates[rnd.randrange(len(candidates))])
+    width = density.shape[1]
+    return index % width, index // width
+
+
+class Targeter:
+    # Estado de mira contra um tabuleiro inimigo: tamanhos dos navios ainda flutuando
+    # e acertos já atribuídos a navios afundados
+    def __init__(self, grid_size: int, fleet: Sequence[int]) -> None:
+        self.grid_size = grid_size
+        self.fleet = sorted(fleet, reverse=True)
+        self.remaining: List[int] = list(self.fleet)
+        self.resolved_mask = 0
+        self.field = DensityField(grid_size, self.remaining)
+
+    def masks(self, miss_mask: int, hit_mask: int) -> Tuple[int, int]:
+        # (bloqueadas, acertos pendentes) vistos pelo campo: acertos de navios afundados bloqueiam
+        return miss_mask | self.resolved_mask, hit_mask & ~self.resolved_mask
+
+    def density(self, miss_mask: int, hit_mask: int) -> np.ndarray:
+        self.field.update(*self.masks(miss_mask, hit_mask))
+        density = self.field.density()
+        if self.field.target and not density.any():
+            # Acertos que nenhum navio restante explica: density_map volta à caça (raro, calculado do zero)
+            density = density_map(self.grid_size, self.remaining, miss_mask, hit_mask, self.resolved_mask)
+        return density
+
+    def choose(self, miss_mask: int, hit_mask: int, rnd: random.Random) -> Optional[Coord]:
+        return best_cell(self.density(miss_mask, hit_mask), rnd)
+
+    def on_sunk(self, cell: Coord, hit_mask: int) -> None:
+        # O navio afundado é um trecho da linha de acertos pendentes que passa por `cell`: navios
+        # encostados formam uma linha só, então o trecho nunca passa do maior tamanho restante
+        # e os acertos que sobram na linha continuam pendentes (outro navio ainda flutuando)
+        if not self.remaining:
+            # Mais navios afundados que o esperado (frota do oponente diferente da assumida): recomeça
+            self.remaining = list(self.fleet)
+        lines = [self.hit_line(cell, hit_mask, 1, 0), self.hit_line(cell, hit_mask, 0, 1)]
+        # Prefere a direção cuja linha inteira tem o tamanho de um navio restante; senão a mais longa
+        line, index = max(lines, key=lambda li: (len(li[0]) in self.remaining, len(li[0])))
+        segment = self.sunk_segment(line, index)
+        for x, y in segment:
+            self.resolved_mask |= cell_bit(x, y, self.grid_size)
+        length = len(segment)
+        size = length if length in self.remaining else self.remaining[-1]
+        self.remaining.remove(size)
+        self.field.set_sizes(self.remaining)
+
+    def sunk_segment(self, line: List[Coord], index: int) -> List[Coord]:
+        # Linha inteira se o comprimento é um tamanho restante; senão o maior tamanho restante que cabe,
+        # de preferência com o último tiro (line[index]) numa das pontas
+        if len(line) in self.remaining:
+            return line
+        fitting = [s for s in self.remaining if s <= len(line)]
+        if not fitting:
+            return line
+        size = fitting[0]
+        starts = range(max(0, index - size + 1), min(index, len(line) - size) + 1)
+        start = next((a for a in starts if a in (index, index - size + 1)), starts[0])
+        return line[start:start + size]
+
+    def hit_line(self, cell: Coord, hit_mask: int, dx: int, dy: int) -> Tuple[List[Coord], int]:
+        # Acertos pendentes contíguos na direção (dx, dy) passando por `cell`, em ordem, e o índice de `cell`
+        pending = hit_mask & ~self.resolved_mask
+        sides: List[List[Coord]] = []
+        for step in (-1, 1):
+            x, y = cell[0] + dx * step, cell[1] + dy * step
+            side: List[Coord] = []
+            while 0 <= x < self.grid_size and 0 <= y < self.grid_size and pending & cell_bit(x, y, self.grid_size):
+                side.append((x, y))
+                x, y = x + dx * step, y + dy * step
+            sides.append(side)
+        before, after = sides
+        return before[::-1] + [cell] + after, len(before)
@@ -0,0 +1,207 @@
+import socket
+import struct
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Formato binário versionado:
+#   cabeçalho: marcador+versão (1 byte) | tipo (1 byte, bit alto = exige ack) | sequência (uint16)
+#   payload:   depende do tipo (coordenadas em bytes, IPv4 empacotados em 4 bytes + portas)
+# O marcador tem o bit alto ligado, então nunca colide com as mensagens de texto legadas (ASCII).
+PROTOCOL_VERSION = 1
+MARKER = 0x80 | PROTOCOL_VERSION
+HEADER = struct.Struct("!BBH")
+COORDS = struct.Struct("!BB")
+COUNT = struct.Struct("!H")
+ACK_BITS = struct.Struct("!I")
+PORTS = struct.Struct("!HH")
+PARTICIPANT = struct.Struct("!4sHH")
+# hello: lado do tabuleiro + quantidade de navios, seguidos de um byte por tamanho de navio
+MATCH_CONFIG = struct.Struct("!HB")
+SEQ_MODULO = 1 << 16
+RELIABLE_FLAG = 0x80
+
+# Tipos de mensagem
+MSG_SHOT = "shot"
+MSG_HIT = "hit"
+MSG_DESTROYED = "destroyed"
+MSG_LOST = "lost"
+MSG_CONNECTING = "Conectando"
+MSG_LEAVING = "Saindo"
+MSG_PARTICIPANTS = "participantes"
+# Anuncia que o remetente entende o formato binário e quais portas UDP/TCP usa
+MSG_HELLO = "hello"
+# Confirmação da camada confiável (reliable_udp.py)
+MSG_ACK = "ack"
+
+TYPE_CODES = {
+    MSG_SHOT: 1,
+    MSG_HIT: 2,
+    MSG_DESTROYED: 3,
+    MSG_LOST: 4,
+    MSG_CONNECTING: 5,
+    MSG_LEAVING: 6,
+    MSG_PARTICIPANTS: 7,
+    MSG_HELLO: 8,
+    MSG_ACK: 9,
+}
+TYPE_NAMES = {code: kind for kind, code in TYPE_CODES.items()}
+
+
+class CodecError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Message:
+    kind: str
+    seq: int = 0
+    x: int = 0
+    y: int = 0
+    ips: Tuple[str, ...] = ()
+    # Portas (udp, tcp) anunciadas: do remetente no hello, de cada IP em `ips` na lista de participantes
+    ports: Tuple[Tuple[int, int], ...] = ()
+    # hello: configuração de partida do remetente (0/() = não informada)
+    grid_size: int = 0
+    fleet: Tuple[int, ...] = ()
+    # ack: bitmask das 32 sequências anteriores a `seq` também recebidas
+    ack_bits: int = 0
+    # O remetente espera um ack (entrega confiável)
+    reliable: bool = False
+    # True se veio no formato de texto legado
+    legacy: bool = False
+
+
+def shot(x: int, y: int, seq: int = 0) -> Message:
+    return Message(MSG_SHOT, seq, x, y)
+
+
+def participants(ips, seq: int = 0, ports=()) -> Message:
+    return Message(MSG_PARTICIPANTS, seq, ips=tuple(ips), ports=tuple(ports))
+
+
+def hello(udp_port: int, tcp_port: int, seq: int = 0, grid_size: int = 0, fleet=()) -> Message:
+    return Message(MSG_HELLO, seq, ports=((udp_port, tcp_port),), grid_size=grid_size, fleet=tuple(fleet))
+
+
+def encode(message: Message) -> bytes:
+    code = TYPE_CODES.get(message.kind)
+    if code is None:
+        raise CodecError(f"unknown message kind: {message.kind}")
+    if message.reliable:
+        code |= RELIABLE_FLAG
+    header = HEADER.pack(MARKER, code, message.seq % SEQ_MODULO)
+    if message.kind == MSG_ACK:
+        return header + ACK_BITS.pack(message.ack_bits & 0xFFFFFFFF)
+    if message.kind == MSG_SHOT:
+        return header + COORDS.pack(message.x, message.y)
+    if message.kind == MSG_HELLO and message.ports:
+        payload = header + PORTS.pack(*message.ports[0])
+        if message.grid_size:
+            fleet = message.fleet[:255]
+            payload += MATCH_CONFIG.pack(message.grid_size, len(fleet)) + bytes(fleet)
+        return payload
+    if message.kind == MSG_PARTICIPANTS:
+        packed = []
+        for i, ip in enumerate(message.ips):
+            udp_port, tcp_port = message.ports[i] if i < len(message.ports) else (0, 0)
+            try:
+                packed.append(PARTICIPANT.pack(socket.inet_aton(ip), udp_port, tcp_port))
+            except OSError:
+                continue
+        return header + COUNT.pack(len(packed)) + b"".join(packed)
+    return header
+
+
+def encode_text(message: Message) -> bytes:
+    # Formato de texto legado, para pares que não falam o binário
+    if message.kind == MSG_SHOT:
+        return f"shot:{message.x},{message.y}".encode("utf-8")
+    if message.kind == MSG_PARTICIPANTS:
+        return ("participantes: [" + ", ".join(f"'{ip}'" for ip in message.ips) + "]").encode("utf-8")
+    return message.kind.encode("utf-8")
+
+
+def decode(data) -> Optional[Message]:
+    # Aceita bytes ou memoryview; devolve None para mensagens vazias ou inválidas
+    if not data:
+        return None
+    if data[0] == MARKER:
+        return decode_binary(data)
+    if data[0] & 0x80:
+        # Versão binária desconhecida
+        return None
+    return decode_text(str(data, "utf-8", errors="ignore").strip())
+
+
+def decode_binary(data) -> Optional[Message]:
+    if len(data) < HEADER.size:
+        return None
+    _, code, seq = HEADER.unpack_from(data, 0)
+    reliable = bool(code & RELIABLE_FLAG)
+    kind = TYPE_NAMES.get(code & ~RELIABLE_FLAG)
+    if kind is None:
+        return None
+    offset = HEADER.size
+    if kind == MSG_SHOT:
+        if len(data) < offset + COORDS.size:
+            return None
+        x, y = COORDS.unpack_from(data, offset)
+        return Message(kind, seq, x, y, reliable=reliable)
+    if kind == MSG_ACK:
+        if len(data) < offset + ACK_BITS.size:
+            return None
+        (bits,) = ACK_BITS.unpack_from(data, offset)
+        return Message(kind, seq, ack_bits=bits)
+    if kind == MSG_PARTICIPANTS:
+        if len(data) < offset + COUNT.size:
+            return None
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        if len(data) < offset + PARTICIPANT.size * count:
+            return None
+        ips = []
+        ports = []
+        for _ in range(count):
+            packed_ip, udp_port, tcp_port = PARTICIPANT.unpack_from(data, offset)
+            ips.append(socket.inet_ntoa(packed_ip))
+            ports.append((udp_port, tcp_port))
+            offset += PARTICIPANT.size
+        return Message(kind, seq, ips=tuple(ips), ports=tuple(ports), reliable=reliable)
+    if kind == MSG_HELLO and len(data) >= offset + PORTS.size:
+        ports = (PORTS.unpack_from(data, offset),)
+        offset += PORTS.size
+        grid_size, fleet = 0, ()
+        # Configuração de partida é opcional (pares antigos mandam só as portas)
+        if len(data) >= offset + MATCH_CONFIG.size:
+            grid_size, count = MATCH_CONFIG.unpack_from(data, offset)
+            offset += MATCH_CONFIG.size
+            if len(data) < offset + count:
+                return None
+            fleet = tuple(bytes(data[offset:offset + count]))
+        return Message(kind, seq, ports=ports, grid_size=grid_size, fleet=fleet, reliable=reliable)
+    return Message(kind, seq, reliable=reliable)
+
+
+def decode_text(msg: str) -> Optional[Message]:
+    if not msg:
+        return None
+    if msg.startswith("shot:"):
+        try:
+            x_str, y_str = msg[5:].strip().split(",", 1)
+            return Message(MSG_SHOT, 0, int(x_str), int(y_str), legacy=True)
+        except ValueError:
+            return None
+    if msg.lower().startswith("participantes:"):
+        payload = msg.split(":", 1)[1]
+        start = payload.find("[")
+        end = payload.find("]")
+        ips = []
+        if start != -1 and end != -1 and end > start:
+            for part in payload[start + 1:end].split(","):
+                ip = part.strip().strip("'").strip('"')
+                if ip:
+                    ips.append(ip)
+        return Message(MSG_PARTICIPANTS, 0, ips=tuple(ips), legacy=True)
+    if msg in TYPE_CODES:
+        return Message(msg, 0, legacy=True)
+    return None
@@ -0,0 +1,46 @@
+import struct
+from typing import List
+
+# Cada mensagem no stream TCP é precedida pelo seu tamanho (uint32 big-endian)
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 1 << 20  # 1 MiB
+
+
+class FrameError(Exception):
+    pass
+
+
+def encode_frame(payload: bytes) -> bytes:
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"frame too large: {len(payload)} bytes")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameBuffer:
+    # Buffer de remontagem por conexão: acumula bytes recebidos e devolve frames completos
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE) -> None:
+        self.buffer = bytearray()
+        self.max_frame_size = max_frame_size
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self.buffer += data
+        frames: List[bytes] = []
+        offset = 0
+        size = len(self.buffer)
+        header = FRAME_HEADER.size
+        while size - offset >= header:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"frame too large: {length} bytes")
+            end = offset + header + length
+            if end > size:
+                break
+            frames.append(bytes(self.buffer[offset + header:end]))
+            offset = end
+        # Descarta de uma vez só os bytes já consumidos
+        if offset:
+            del self.buffer[:offset]
+        return frames
+
+    def pending_bytes(self) -> int:
+        return len(self.buffer)
@@ -0,0 +1,142 @@
+import ipaddress
+import socket
+import struct
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# ioctls do Linux para consultar endereço, máscara e broadcast de uma interface
+SIOCGIFADDR = 0x8915
+SIOCGIFBRDADDR = 0x8919
+SIOCGIFNETMASK = 0x891B
+
+GLOBAL_BROADCAST = "255.255.255.255"
+
+
+@dataclass(frozen=True)
+class Interface:
+    name: str
+    address: str
+    netmask: str
+    broadcast: str
+
+    @property
+    def is_loopback(self) -> bool:
+        return self.address.startswith("127.")
+
+
+def _ioctl_addr(sock: socket.socket, name: str, request: int) -> Optional[str]:
+    import fcntl
+    try:
+        packed = fcntl.ioctl(sock.fileno(), request, struct.pack("256s", name[:15].encode("utf-8")))
+    except OSError:
+        return None
+    return socket.inet_ntoa(packed[20:24])
+
+
+def _broadcast_for(address: str, netmask: str) -> str:
+    network = ipaddress.IPv4Network(f"{address}/{netmask}", strict=False)
+    return str(network.broadcast_address)
+
+
+def _linux_interfaces() -> List[Interface]:
+    result: List[Interface] = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            address = _ioctl_addr(sock, name, SIOCGIFADDR)
+            if not address:
+                continue
+            netmask = _ioctl_addr(sock, name, SIOCGIFNETMASK) or "255.255.255.0"
+            broadcast = _ioctl_addr(sock, name, SIOCGIFBRDADDR)
+            if not broadcast or broadcast == "0.0.0.0":
+                broadcast = _broadcast_for(address, netmask)
+            result.append(Interface(name, address, netmask, broadcast))
+    finally:
+        sock.close()
+    return result
+
+
+def _hostname_interfaces() -> List[Interface]:
+    # Sem ioctl (Windows/macOS): endereços resolvidos do hostname; assume /24
+    result: List[Interface] = []
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError:
+        return result
+    seen = set()
+    for info in infos:
+        address = info[4][0]
+        if address in seen:
+            continue
+        seen.add(address)
+        result.append(Interface(address, address, "255.255.255.0", _broadcast_for(address, "255.255.255.0")))
+    return result
+
+
+@lru_cache(maxsize=1)
+def list_interfaces() -> Tuple[Interface, ...]:
+    # Enumera interfaces IPv4 sem depender de rota padrão (funciona em LAN isolada)
+    interfaces: List[Interface] = []
+    if sys.platform.startswith("linux"):
+        try:
+            interfaces = _linux_interfaces()
+        except Exception as e:
+            print(f"[interfaces] ioctl enumeration failed: {e}")
+    if not interfaces:
+        interfaces = _hostname_interfaces()
+    return tuple(interfaces)
+
+
+def _route_ip() -> Optional[str]:
+    temp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # This does not send traffic; it asks OS for the route/interface
+        temp.connect(("8.8.8.8", 80))
+        return temp.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        temp.close()
+
+
+@lru_cache(maxsize=8)
+def detect_local_ip(bind_addr: Optional[str] = None) -> str:
+    # Endereço explícito tem prioridade; depois a interface da rota padrão, se houver;
+    # por fim a primeira interface que não seja loopback
+    if bind_addr and bind_addr != "0.0.0.0":
+        return bind_addr
+    routed = _route_ip()
+    if routed:
+        return routed
+    for iface in list_interfaces():
+        if not iface.is_loopback:
+            return iface.address
+    return "127.0.0.1"
+
+
+def is_loopback(address: Optional[str]) -> bool:
+    return bool(address) and address.startswith("127.")
+
+
+def loopback_addresses(count: int) -> List[str]:
+    # Endereços 127.0.0.1 .. 127.0.0.N para o modo de várias instâncias num host
+    return [f"127.0.{(i + 1) // 256}.{(i + 1) % 256}" for i in range(count)]
+
+
+def local_addresses() -> Tuple[str, ...]:
+    return tuple(iface.address for iface in list_interfaces())
+
+
+def broadcast_addresses(bind_addr: Optional[str] = None) -> List[str]:
+    # Um endereço de broadcast por interface (ou só o da interface escolhida)
+    result: List[str] = []
+    for iface in list_interfaces():
+        if iface.is_loopback:
+            continue
+        if bind_addr and bind_addr != "0.0.0.0" and iface.address != bind_addr:
+            continue
+        if iface.broadcast not in result:
+            result.append(iface.broadcast)
+    return result or [GLOBAL_BROADCAST]
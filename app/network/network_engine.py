@@ -0,0 +1,202 @@
+import queue
+import selectors
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from app.network.p2p_udp import UdpPeer
+from app.network.p2p_tcp import TcpPeer
+from app.network import codec
+from app.network.codec import Message
+from app.naval_battle.game_engine import Outgoing, OUT_SHOT, OUT_HIT, OUT_DESTROYED, OUT_LOST
+
+# Tipos de evento entregues à UI
+EVENT_UDP = "udp"
+EVENT_TCP = "tcp"
+EVENT_PARTICIPANTS = "participants"
+
+NetworkEvent = Tuple[str, Optional[Tuple[str, int]], Optional[Message]]
+
+
+class NetworkEngine(threading.Thread):
+    # Thread dedicada que é dona dos sockets UDP/TCP.
+    # Eventos recebidos vão para `events` (a UI drena uma vez por frame) e envios chegam por `outgoing`.
+    def __init__(self, udp_peer: UdpPeer, tcp_peer: TcpPeer, poll_interval: float = 0.05) -> None:
+        super().__init__(name="NetworkEngine", daemon=True)
+        self.udp_peer = udp_peer
+        self.tcp_peer = tcp_peer
+        self.poll_interval = poll_interval
+
+        self.events: "queue.Queue[NetworkEvent]" = queue.Queue()
+        self.outgoing: "queue.Queue[Tuple[Callable, tuple]]" = queue.Queue()
+        self.stopped = threading.Event()
+        # Chamado pela thread de rede quando um passo entrega eventos novos (a UI usa para sair do modo ocioso)
+        self.on_events: Optional[Callable[[], None]] = None
+
+        # Par de sockets para acordar o select() assim que houver envio pendente
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+
+        # Seletor persistente (epoll/kqueue quando houver): sem o limite de FD_SETSIZE do select(),
+        # necessário com muitos peers no mesmo processo (bots headless)
+        self.selector = selectors.DefaultSelector()
+        for sock in (self.wake_r, self.udp_peer.server, self.tcp_peer.server):
+            self.selector.register(sock, selectors.EVENT_READ)
+        self.registered_inbound: set = set()
+
+    # API usada pela UI (thread principal)
+    def poll_events(self) -> List[NetworkEvent]:
+        batch: List[NetworkEvent] = []
+        try:
+            while True:
+                batch.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def submit(self, fn: Callable, *args) -> None:
+        self.outgoing.put((fn, args))
+        self.wake()
+
+    def wake(self) -> None:
+        try:
+            self.wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def send_shot_unicast(self, x: int, y: int) -> None:
+        self.submit(self.udp_peer.send_shot_unicast, x, y)
+
+    def send_lost_unicast(self) -> None:
+        self.submit(self.udp_peer.send_lost_unicast)
+
+    def send_broadcast_connecting(self) -> None:
+        self.submit(self.udp_peer.send_broadcast_connecting)
+
+    def send_broadcast_leaving(self) -> None:
+        self.submit(self.udp_peer.send_broadcast_leaving)
+
+    def send_tcp_message(self, ip: str, kind: str) -> None:
+        self.submit(self.send_tcp_now, ip, kind)
+
+    def send_tcp_now(self, ip: str, kind: str) -> None:
+        # Executa na thread de rede: porta anunciada pelo par e formato que ele entende
+        message = Message(kind, self.udp_peer.next_seq())
+        port = self.udp_peer.tcp_port_of(ip)
+        self.tcp_peer.send_message(ip, port, message, binary=self.udp_peer.prefers_binary(ip))
+
+    def perform(self, actions: List[Outgoing]) -> None:
+        # Traduz as ações do GameEngine em envios
+        for action in actions:
+            if action.kind == OUT_SHOT:
+                print(f"[NetworkEngine] Shot at {(action.x, action.y)}")
+                self.send_shot_unicast(action.x, action.y)
+            elif action.kind == OUT_HIT:
+                self.send_tcp_message(action.ip, codec.MSG_HIT)
+            elif action.kind == OUT_DESTROYED:
+                self.send_tcp_message(action.ip, codec.MSG_DESTROYED)
+            elif action.kind == OUT_LOST:
+                self.send_lost_unicast()
+
+    def get_participants(self) -> list:
+        return self.udp_peer.get_participants()
+
+    def get_participants_version(self) -> int:
+        return self.udp_peer.get_participants_version()
+
+    def get_opponent_fleets(self) -> Dict[str, Tuple[int, ...]]:
+        # Participantes ativos no mesmo tabuleiro, exceto nós -> frota anunciada no hello (vazia = não anunciada)
+        local_ip = self.get_local_ip()
+        grid_size = self.udp_peer.match_config.grid_size
+        return {p.ip: p.fleet for p in self.get_participants()
+                if p.active and p.ip != local_ip and p.plays_on(grid_size)}
+
+    def get_mismatched_peers(self) -> Dict[str, int]:
+        # Participantes ativos que anunciaram outro tamanho de tabuleiro (ip -> lado); ficam fora da partida
+        grid_size = self.udp_peer.match_config.grid_size
+        return {p.ip: p.grid_size for p in self.get_participants() if p.active and not p.plays_on(grid_size)}
+
+    def get_participants_count(self) -> int:
+        return self.udp_peer.get_participants_count()
+
+    def get_local_ip(self) -> str:
+        return self.udp_peer.get_local_ip()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        # Encerra a thread após enviar o que ainda estiver na fila de saída
+        self.stopped.set()
+        self.wake()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    # Loop da thread de rede
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.step(self.poll_interval)
+            except Exception as e:
+                print(f"[NetworkEngine] loop error: {e}")
+        self.flush_outgoing()
+        self.tcp_peer.close()
+        self.selector.close()
+        self.wake_r.close()
+        self.wake_w.close()
+
+    def step(self, timeout: float) -> None:
+        # Acorda a tempo da próxima retransmissão pendente
+        deadline = self.udp_peer.poll_retransmits()
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+        self.sync_inbound()
+        rlist = {key.fileobj for key, _ in self.selector.select(timeout)}
+        if self.wake_r in rlist:
+            try:
+                while self.wake_r.recv(4096):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+
+        self.flush_outgoing()
+
+        if self.udp_peer.server in rlist:
+            self.read_udp()
+
+        ready = [conn for conn in rlist if conn in self.registered_inbound]
+        for addr, message in self.tcp_peer.drain_messages(ready):
+            if message.kind == codec.MSG_PARTICIPANTS:
+                self.udp_peer.receive_participant_list(message)
+                self.events.put((EVENT_PARTICIPANTS, addr, message))
+            else:
+                self.events.put((EVENT_TCP, addr, message))
+
+        if self.on_events is not None and not self.events.empty():
+            self.on_events()
+
+    def sync_inbound(self) -> None:
+        # Mantém o seletor igual ao conjunto de conexões de entrada abertas do TcpPeer
+        current = set(self.tcp_peer.inbound.keys())
+        for conn in self.registered_inbound - current:
+            try:
+                self.selector.unregister(conn)
+            except (KeyError, ValueError):
+                pass
+        for conn in current - self.registered_inbound:
+            self.selector.register(conn, selectors.EVENT_READ)
+        self.registered_inbound = current
+
+    def read_udp(self) -> None:
+        # Todos os datagramas prontos em uma única chamada
+        for addr, message in self.udp_peer.drain_messages():
+            self.events.put((EVENT_UDP, addr, message))
+
+    def flush_outgoing(self) -> None:
+        while True:
+            try:
+                fn, args = self.outgoing.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[NetworkEngine] send error: {e}")
@@ -1,11 +1,36 @@
 import socket
+import select
+import time
+from typing import Dict, List, Optional, Tuple
+from app.network.framing import FrameBuffer, FrameError, encode_frame
+from app.network import codec
+from app.network.codec import Message
+
+DEFAULT_TCP_PORT = 5001
 
 class TcpPeer:
-    def __init__(self, tcp_port: int = 5001) -> None:
+    def __init__(self, tcp_port: int = DEFAULT_TCP_PORT, connect_timeout: float = 2.0, idle_timeout: float = 60.0,
+                 retry_backoff: float = 5.0, bind_addr: Optional[str] = None) -> None:
         self.server = None
+        self.bind_addr = bind_addr or "0.0.0.0"
+        # 0 = porta escolhida pelo sistema; a porta real é anunciada aos pares
+        self.tcp_port = tcp_port
         self.setup_tcp_server(tcp_port)
 
-        self.tcp_port = tcp_port
+        # Pool de conexões de saída: uma conexão persistente por IP de destino
+        self.connections: Dict[str, socket.socket] = {}
+        self.last_used: Dict[str, float] = {}
+        # IPs cuja conexão falhou recentemente (evita travar o loop tentando de novo a cada mensagem)
+        self.failed_until: Dict[str, float] = {}
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.retry_backoff = retry_backoff
+        self.last_prune = time.monotonic()
+
+        # Conexões de entrada mantidas abertas (socket -> endereço) e buffer de leitura por conexão
+        self.inbound: Dict[socket.socket, Tuple[str, int]] = {}
+        self.inbound_buffers: Dict[socket.socket, FrameBuffer] = {}
+        self.recv_size = 65536
 
     def setup_tcp_server(self, tcp_port: int) -> socket.socket:
         # Create TCP server socket once; configure to avoid blocking UI loop
@@ -15,32 +40,175 @@ class TcpPeer:
             self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         except Exception:
             pass
-        # Bind to all interfaces so peers can connect (adjust if you really want localhost only)
-        self.server.bind(('0.0.0.0', tcp_port))
+        # Bind to all interfaces by default so peers can connect (bind_addr restricts to one interface)
+        self.server.bind((self.bind_addr, tcp_port))
+        self.tcp_port = self.server.getsockname()[1]
         # Start listening once (do not call listen() repeatedly inside the app loop)
         self.server.listen(5)
         # Non-blocking mode so accept() will not stall the main loop
         self.server.setblocking(False)
 
-    def wait_for_connection(self):
-        try:
-            # Fast path: try non-blocking accept directly
-            conn, addr = self.server.accept()
+    def drain_messages(self, ready: Optional[List[socket.socket]] = None) -> List[Tuple[Tuple[str, int], Message]]:
+        # Retorna todas as mensagens completas disponíveis neste tick
+        # (ready: conexões de entrada já apontadas como legíveis pelo seletor de quem chama)
+        self.accept_pending()
+        messages = self.read_inbound(ready)
+        self.prune_connections()
+        return messages
+
+    def accept_pending(self) -> None:
+        # Aceita todas as conexões pendentes; elas permanecem abertas para várias mensagens
+        while True:
+            try:
+                conn, addr = self.server.accept()
+            except BlockingIOError:
+                return
+            except Exception as e:
+                print(f"[TcpPeer] accept error: {e}")
+                return
             conn.setblocking(False)
-            # get message
-            data = conn.recv(1024) if conn else b""
-            print(f"[TcpPeer]Accepted connection from {addr}: {data.decode('utf-8', errors='ignore').strip()}")
-
-            return conn, addr, data.decode("utf-8", errors="ignore").strip()
-        except BlockingIOError:
-            return None, None, None
-        except Exception as e:
-            print(f"[TcpPeer] wait_for_connection error: {e}")
-            return None, None, None
-
-    def send_message(self, ip: str, port: int, msg: str) -> bool:
-        with socket.create_connection((ip, port), timeout=2.0) as s:
-            s.sendall(msg.encode("utf-8"))
-        print(f"[TcpPeer] Sent TCP message to {ip}:{port}: {msg}")
-
-        
+            self.inbound[conn] = addr
+            self.inbound_buffers[conn] = FrameBuffer()
+            print(f"[TcpPeer] Accepted connection from {addr}")
+
+    def read_inbound(self, ready: Optional[List[socket.socket]] = None) -> List[Tuple[Tuple[str, int], Message]]:
+        messages: List[Tuple[Tuple[str, int], Message]] = []
+        if not self.inbound:
+            return messages
+        if ready is not None:
+            rlist = ready
+        else:
+            try:
+                rlist, _, _ = select.select(list(self.inbound.keys()), [], [], 0.0)
+            except Exception as e:
+                print(f"[TcpPeer] select error: {e}")
+                return messages
+        for conn in rlist:
+            if conn not in self.inbound:
+                continue
+            addr = self.inbound.get(conn)
+            buffer = self.inbound_buffers.get(conn)
+            closed = False
+            # Lê tudo o que o kernel já tem para esta conexão
+            while True:
+                try:
+                    data = conn.recv(self.recv_size)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    data = b""
+                if not data:
+                    closed = True
+                    break
+                try:
+                    frames = buffer.feed(data)
+                except FrameError as e:
+                    print(f"[TcpPeer] Protocol error from {addr}: {e}")
+                    closed = True
+                    break
+                for frame in frames:
+                    message = codec.decode(frame)
+                    if message is not None:
+                        messages.append((addr, message))
+                if len(data) < self.recv_size:
+                    break
+            if closed:
+                self.close_inbound(conn)
+        return messages
+
+    def close_inbound(self, conn: socket.socket) -> None:
+        self.inbound.pop(conn, None)
+        self.inbound_buffers.pop(conn, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def get_connection(self, ip: str, port: int) -> Optional[socket.socket]:
+        conn = self.connections.get(ip)
+        if conn is not None:
+            return conn
+        now = time.monotonic()
+        if self.failed_until.get(ip, 0.0) > now:
+            return None
+        try:
+            # Com interface explícita, a conexão sai dela (no modo loopback identifica a instância)
+            source = (self.bind_addr, 0) if self.bind_addr != "0.0.0.0" else None
+            conn = socket.create_connection((ip, port), timeout=self.connect_timeout, source_address=source)
+        except OSError as e:
+            print(f"[TcpPeer] Could not connect to {ip}:{port}: {e}")
+            self.failed_until[ip] = now + self.retry_backoff
+            return None
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.failed_until.pop(ip, None)
+        self.connections[ip] = conn
+        self.last_used[ip] = now
+        return conn
+
+    def close_connection(self, ip: str) -> None:
+        conn = self.connections.pop(ip, None)
+        self.last_used.pop(ip, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def prune_connections(self, interval: float = 1.0) -> None:
+        now = time.monotonic()
+        if now - self.last_prune < interval:
+            return
+        self.last_prune = now
+
+        # Remove conexões ociosas
+        for ip, used in list(self.last_used.items()):
+            if now - used > self.idle_timeout:
+                self.close_connection(ip)
+
+        # Remove conexões que o outro lado fechou (socket legível com EOF ou erro)
+        if not self.connections:
+            return
+        try:
+            rlist, _, xlist = select.select(list(self.connections.values()), [], list(self.connections.values()), 0.0)
+        except Exception:
+            return
+        dead = set(xlist)
+        for conn in rlist:
+            try:
+                if not conn.recv(1, socket.MSG_PEEK):
+                    dead.add(conn)
+            except OSError:
+                dead.add(conn)
+        for ip, conn in list(self.connections.items()):
+            if conn in dead:
+                print(f"[TcpPeer] Dropping dead connection to {ip}")
+                self.close_connection(ip)
+
+    def send_message(self, ip: str, port: int, message: Message, binary: bool = True) -> bool:
+        payload = codec.encode(message) if binary else codec.encode_text(message)
+        data = encode_frame(payload)
+        # Uma nova tentativa caso a conexão do pool tenha sido fechada pelo outro lado
+        for _ in range(2):
+            conn = self.get_connection(ip, port)
+            if conn is None:
+                return False
+            try:
+                conn.sendall(data)
+            except OSError as e:
+                print(f"[TcpPeer] Send to {ip}:{port} failed, reconnecting: {e}")
+                self.close_connection(ip)
+                continue
+            self.last_used[ip] = time.monotonic()
+            print(f"[TcpPeer] Sent TCP message to {ip}:{port}: {message.kind}")
+            return True
+        return False
+
+    def close(self) -> None:
+        for ip in list(self.connections.keys()):
+            self.close_connection(ip)
+        for conn in list(self.inbound.keys()):
+            self.close_inbound(conn)
+        try:
+            self.server.close()
+        except Exception:
+            pass
@@ -1,139 +1,316 @@
 import socket
-import select
 import time
-from app.naval_battle.player_model import Player
-# 192.168.15.255
+from typing import Dict, List, Optional, Set, Tuple
+from app.network.participants import ParticipantRegistry
+from app.network import codec, interfaces
+from app.network.codec import Message
+from app.network.reliable_udp import ReliableChannel
+from app.network.p2p_tcp import DEFAULT_TCP_PORT
+from app.naval_battle.match_config import MatchConfig
+
+DEFAULT_UDP_PORT = 5000
 
 class UdpPeer:
-    def __init__(self, udp_port: int = 5000, broadcast_addr: str = "255.255.255.255", tcp_peer=None) -> None:
+    def __init__(self, udp_port: int = DEFAULT_UDP_PORT, broadcast_addr: Optional[str] = None, tcp_peer=None,
+                 recv_buffer_size: Optional[int] = None, max_datagram_size: int = 2048, binary: bool = True,
+                 reliable: bool = True, bind_addr: Optional[str] = None, discovery_port: int = DEFAULT_UDP_PORT,
+                 discovery_targets: Optional[List[str]] = None, match_config: Optional[MatchConfig] = None) -> None:
         self.server = None
+        # 0 = porta escolhida pelo sistema (atualizada após o bind)
         self.udp_port = udp_port
-        self.broadcast_addr = broadcast_addr
-        # Track known participants (PlayerModel instances)
-        self.participants = []
-        # Optional TcpPeer instance for TCP communications (client/server)
+        # Porta para onde vão os "Conectando"/"Saindo" e porta assumida para pares que não anunciaram a sua
+        self.discovery_port = discovery_port
+        # Endereços extras que recebem a descoberta por unicast (ex.: modo loopback)
+        self.discovery_targets = list(discovery_targets or [])
+        # Tabuleiro/frota desta instância, anunciados no "hello"
+        self.match_config = match_config or MatchConfig()
+        # Formato binário (codec.py) com pares que o anunciaram; texto legado com os demais
+        self.binary = binary
+        self.binary_peers: Set[str] = set()
+        self.seq = 0
+        # Camada confiável opcional (acks + retransmissão) para tiros e "lost" com pares binários
+        self.reliable = reliable
+        self.channels: Dict[str, ReliableChannel] = {}
+        # Buffer de recepção do kernel (SO_RCVBUF); aumentar em lobbies grandes evita descartes
+        self.recv_buffer_size = recv_buffer_size
+        # Buffer pré-alocado reutilizado por recvfrom_into
+        self.recv_buffer = bytearray(max_datagram_size)
+        self.recv_view = memoryview(self.recv_buffer)
+        # Interface escolhida explicitamente (None = detectar)
+        self.bind_addr = bind_addr
+        # Modo loopback: várias instâncias no mesmo host, cada uma com seu 127.x.y.z
+        self.loopback = interfaces.is_loopback(bind_addr)
+        # Broadcast: endereço fixo se informado; senão um por interface (ex.: 192.168.15.255)
+        if broadcast_addr:
+            self.broadcast_addrs = [broadcast_addr]
+        elif self.loopback:
+            self.broadcast_addrs = []
+        else:
+            self.broadcast_addrs = interfaces.broadcast_addresses(bind_addr)
+        # Track known participants, indexed by IP
+        self.participants = ParticipantRegistry()
+        # Optional TcpPeer instance for TCP communications (client/server); its port is advertised in "hello"
         self.tcp_peer = tcp_peer
-        # Detect local IP to ignore our own broadcast loopback
-        self.local_ip = self._detect_local_ip()
+        self.tcp_port = tcp_peer.tcp_port if tcp_peer is not None else DEFAULT_TCP_PORT
+        # Detect local IP (cached, works without a default route) and every address of this host,
+        # to ignore our own broadcast loopback on any interface
+        self.local_ip = interfaces.detect_local_ip(bind_addr)
+        if self.loopback:
+            # Outras instâncias também estão em 127.0.0.0/8: só o nosso endereço é "nosso"
+            self.own_ips = {self.local_ip}
+        else:
+            self.own_ips = {self.local_ip, *interfaces.local_addresses()}
         # Start UDP server after required attributes are initialized
         self.setup_udp_server(udp_port)
 
     def setup_udp_server(self, udp_port: int) -> socket.socket:
         self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.server.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        self.server.bind(('0.0.0.0', udp_port))
+        if self.recv_buffer_size:
+            self.set_recv_buffer_size(self.recv_buffer_size)
+        # Endereço curinga: no Linux um socket preso a um IP unicast não recebe broadcasts.
+        # bind_addr define a identidade (local_ip) e as interfaces usadas para broadcast.
+        # No modo loopback não há broadcast, então cada instância fica presa ao seu 127.x.y.z.
+        self.server.bind((self.local_ip if self.loopback else '0.0.0.0', udp_port))
+        self.udp_port = self.server.getsockname()[1]
+        # Non-blocking: drain_messages lê até esvaziar a fila do kernel
+        self.server.setblocking(False)
 
         # Add ourselves as an active participant
-        self.participants.append(Player(self.local_ip, True))
+        self.participants.upsert(self.local_ip, True, self.udp_port, self.tcp_port)
+
+    def set_recv_buffer_size(self, size: int) -> int:
+        # O kernel pode ajustar o valor (Linux dobra e limita por net.core.rmem_max)
+        self.recv_buffer_size = size
+        try:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+        except OSError as e:
+            print(f"[UdpPeer] Could not set SO_RCVBUF={size}: {e}")
+        return self.server.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
 
-    def wait_for_message(self):
-        # read / write / error lists
-        rlist, _, _ = select.select([self.server], [], [], 0.0)
-        if not rlist:
-            return None, None
+    def drain_messages(self, max_batch: int = 1024) -> List[Tuple[Tuple[str, int], Message]]:
+        # Lê todos os datagramas prontos de uma vez e devolve os eventos decodificados
+        messages: List[Tuple[Tuple[str, int], Message]] = []
+        for _ in range(max_batch):
+            try:
+                nbytes, addr = self.server.recvfrom_into(self.recv_buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                # Windows reporta ICMP port unreachable como erro no recv; ignora e continua
+                continue
+            message = codec.decode(self.recv_view[:nbytes])
+            if message is not None and self.handle_datagram(addr, message):
+                messages.append((addr, message))
+        return messages
 
-        data, addr = self.server.recvfrom(1024)
-        msg = data.decode("utf-8", errors="ignore").strip()
+    def handle_datagram(self, addr, message: Message) -> bool:
+        # Atualiza o estado de participantes; retorna False se a mensagem não deve chegar à UI
         ip = addr[0]
         # Ignore our own messages (e.g., broadcast loopback)
-        if ip == getattr(self, "local_ip", None):
-            return None, None
-        print(f"Received message from {addr}: {msg}")
-
-        # On discovery broadcast "Conectando": add sender as participant and reply via TCP:5001 with list
-        if msg == "Conectando":
-            # reactivate if already known, otherwise add
-            found = False
-            for p in self.participants:
-                if p.ip == ip:
-                    p.active = True
-                    found = True
-                    break
-            if not found:
-                self.participants.append(Player(ip, True))
+        if ip in self.own_ips and addr[1] == self.udp_port:
+            return False
+        print(f"Received message from {addr}: {message.kind}")
+
+        # Qualquer mensagem binária indica que o par entende o formato novo
+        newly_binary = not message.legacy and ip not in self.binary_peers
+        if newly_binary:
+            self.binary_peers.add(ip)
+
+        # On discovery broadcast "Conectando": add sender as participant and reply with list
+        if message.kind == codec.MSG_ACK:
+            channel = self.channels.get(ip)
+            if channel is not None:
+                channel.on_ack(message.seq, message.ack_bits, time.monotonic())
+            return False
+
+        # Mensagem confiável: confirma sempre, mas entrega à UI apenas uma vez
+        if message.reliable and not self.accept_reliable(addr, message.seq):
+            return False
+
+        if message.kind == codec.MSG_CONNECTING:
+            # Par (re)entrando: recomeça a numeração confiável com ele
+            self.channels.pop(ip, None)
+            # reactivate if already known, otherwise add (a porta de origem é a porta UDP do par)
+            self.participants.upsert(ip, True, udp_port=addr[1])
             try:
-                participant_ips = sorted({p.ip for p in self.participants})
-                payload = "participantes: [" + ", ".join(f"'{ip}'" for ip in participant_ips) + "]"
                 # Reply via UDP unicast to the requester with the participants list
-                self.server.sendto(payload.encode("utf-8"), (ip, self.udp_port))
+                players = sorted(self.participants.snapshot(), key=lambda p: p.ip)
+                message = codec.participants([p.ip for p in players], ports=[(p.udp_port, p.tcp_port) for p in players])
+                self.send_to(ip, message)
+                if self.binary:
+                    self.send_hello(ip)
             except Exception as e:
                 print(f"[UdpPeer] UDP send participants error: {e}")
+            return True
+
+        if message.kind == codec.MSG_LEAVING:
+            self.participants.deactivate(ip)
+            return True
+
+        if not self.participants.touch(ip, udp_port=addr[1]):
+            self.participants.upsert(ip, True, udp_port=addr[1])
+
+        if message.kind == codec.MSG_HELLO:
+            if message.ports:
+                self.participants.upsert(ip, True, *message.ports[0])
+            if message.grid_size:
+                self.receive_match_config(ip, message.grid_size, message.fleet)
+            # Responde uma única vez para que o outro lado também nos marque como binários
+            if newly_binary and self.binary:
+                self.send_hello(ip)
+            return False
+
+        # Resposta ao "Conectando" chega por UDP unicast
+        if message.kind == codec.MSG_PARTICIPANTS:
+            self.receive_participant_list(message)
+            return False
+
+        # Tiro de quem joga em outro tabuleiro: não é oponente nesta partida (e também não recebe os nossos)
+        if message.kind == codec.MSG_SHOT and not self.plays_with(ip):
+            return False
+
+        return True
+
+    def next_seq(self) -> int:
+        self.seq = (self.seq + 1) % codec.SEQ_MODULO
+        return self.seq
+
+    def prefers_binary(self, ip: str) -> bool:
+        return self.binary and ip in self.binary_peers
 
-        elif msg == "Saindo":
-            for participant in self.participants:
-                if participant.ip == ip:
-                    participant.active = False
-                    break
+    def encode_for(self, ip: str, message: Message) -> bytes:
+        # Binário para pares que já se anunciaram; texto legado para os demais
+        if self.prefers_binary(ip):
+            return codec.encode(message)
+        return codec.encode_text(message)
 
-        elif ip not in [p.ip for p in self.participants]:
-            self.participants.append(Player(ip, True))
+    def port_of(self, ip: str) -> int:
+        player = self.participants.get(ip)
+        return player.udp_port if player is not None and player.udp_port else self.discovery_port
 
-        return addr, msg
+    def tcp_port_of(self, ip: str) -> int:
+        player = self.participants.get(ip)
+        return player.tcp_port if player is not None and player.tcp_port else DEFAULT_TCP_PORT
 
-    def _detect_local_ip(self) -> str:
-        temp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    def send_to(self, ip: str, message: Message) -> None:
+        self.server.sendto(self.encode_for(ip, message), (ip, self.port_of(ip)))
+
+    def get_channel(self, ip: str) -> ReliableChannel:
+        channel = self.channels.get(ip)
+        if channel is None:
+            channel = ReliableChannel()
+            self.channels[ip] = channel
+        return channel
+
+    def accept_reliable(self, addr, seq: int) -> bool:
+        channel = self.get_channel(addr[0])
+        is_new = channel.on_receive(seq)
+        latest, bits = channel.ack_state()
+        ack = codec.encode(Message(codec.MSG_ACK, latest, ack_bits=bits))
         try:
-            # This does not send traffic; it asks OS for the route/interface
-            temp.connect(("8.8.8.8", 80))
-            return temp.getsockname()[0]
-       
-        finally:
-            temp.close()
+            self.server.sendto(ack, addr)
+        except OSError as e:
+            print(f"[UdpPeer] ack send error: {e}")
+        return is_new
+
+    def send_reliable(self, ip: str, message: Message) -> None:
+        # Pares legados não entendem acks: envia uma vez em texto
+        if not (self.reliable and self.prefers_binary(ip)):
+            self.send_to(ip, message)
+            return
+        channel = self.get_channel(ip)
+        seq = channel.next_seq()
+        data = codec.encode(Message(message.kind, seq, message.x, message.y, message.ips, reliable=True))
+        channel.track(seq, data, time.monotonic())
+        self.server.sendto(data, (ip, self.port_of(ip)))
+
+    def poll_retransmits(self) -> Optional[float]:
+        # Reenvia o que passou do RTO; retorna o próximo prazo (time.monotonic) ou None
+        now = time.monotonic()
+        deadline = None
+        for ip, channel in self.channels.items():
+            if not channel.pending:
+                continue
+            for data in channel.due_retransmits(now):
+                try:
+                    self.server.sendto(data, (ip, self.port_of(ip)))
+                except OSError as e:
+                    print(f"[UdpPeer] retransmit to {ip} failed: {e}")
+            at = channel.next_deadline()
+            if at is not None and (deadline is None or at < deadline):
+                deadline = at
+        return deadline
+
+    def send_hello(self, ip: str) -> None:
+        config = self.match_config
+        message = codec.hello(self.udp_port, self.tcp_port, self.next_seq(), config.grid_size, config.fleet)
+        self.server.sendto(codec.encode(message), (ip, self.port_of(ip)))
+
+    def receive_match_config(self, ip: str, grid_size: int, fleet: Tuple[int, ...]) -> None:
+        self.participants.set_match_config(ip, grid_size, fleet)
+        config = self.match_config
+        # Frota diferente é aceita (a mira usa a anunciada); tabuleiro diferente tira o par da partida
+        if grid_size != config.grid_size:
+            print(f"[UdpPeer] {ip} joga em {grid_size}x{grid_size}; ignorado nesta partida ({config.describe()})")
+
+    def plays_with(self, ip: str) -> bool:
+        player = self.participants.get(ip)
+        return player is None or player.plays_on(self.match_config.grid_size)
 
     def send_broadcast_connecting(self) -> None:
         print("[UdpPeer] Sending broadcast 'Conectando'")
-        msg = 'Conectando'
-        self.server.sendto(msg.encode("utf-8"), (self.broadcast_addr, self.udp_port))
+        # Broadcasts continuam em texto para que pares legados também nos descubram
+        msg = codec.encode_text(Message(codec.MSG_CONNECTING))
+        self.broadcast(msg)
 
     def send_broadcast_leaving(self) -> None:
         print("[UdpPeer] Sending broadcast 'Saindo'")
-        msg = 'Saindo'
-        self.server.sendto(msg.encode("utf-8"), (self.broadcast_addr, self.udp_port))
-
-    def send_shot_unicast(self, message: str) -> None:
-        for participant in self.participants:
-            if participant.active:
-                ip = participant.ip
-                if ip != self.local_ip:
-                    print("[UdpPeer] Sending unicast shot message to", ip)
-                    self.server.sendto(message.encode("utf-8"), (ip, self.udp_port))
-
-    def send_lost_unicast(self, message: str) -> None:
-        for participant in self.participants:
-            if participant.active:
-                ip = participant.ip
-                if ip != self.local_ip:
-                    print("[UdpPeer] Sending unicast lost message to", ip)
-                    self.server.sendto(message.encode("utf-8"), (ip, self.udp_port))
-
-    def receive_participant_list(self, msg: str) -> None:
-        try:
-            payload = msg.split(":", 1)[1]
-            start = payload.find("[")
-            end = payload.find("]")
-            if start != -1 and end != -1 and end > start:
-                inner = payload[start + 1:end]
-                ips = []
-                for part in inner.split(","):
-                    ip = part.strip().strip("'").strip('"')
-                    if ip:
-                        ips.append(ip)
-                known = {p.ip for p in self.participants}
-                for ip in ips:
-                    if ip == self.local_ip:
-                        continue
-                    if ip in known:
-                        for p in self.participants:
-                            if p.ip == ip:
-                                p.active = True
-                                break
-                    else:
-                        self.participants.append(Player(ip, True))
-        except Exception as e:
-            print(f"[UdpPeer] receive_participant_list parse error: {e}")
+        msg = codec.encode_text(Message(codec.MSG_LEAVING))
+        self.broadcast(msg)
+
+    def broadcast(self, data: bytes) -> None:
+        # Broadcast por interface + unicast para os alvos de descoberta explícitos
+        for target in self.broadcast_addrs + self.discovery_targets:
+            if target == self.local_ip and self.discovery_port == self.udp_port:
+                continue
+            try:
+                self.server.sendto(data, (target, self.discovery_port))
+            except OSError as e:
+                print(f"[UdpPeer] Broadcast to {target} failed: {e}")
+
+    def send_shot_unicast(self, x: int, y: int) -> None:
+        message = codec.shot(x, y, self.next_seq())
+        for ip in self.participants.active_ips(exclude=self.local_ip, grid_size=self.match_config.grid_size):
+            print("[UdpPeer] Sending unicast shot message to", ip)
+            self.send_reliable(ip, message)
+
+    def send_lost_unicast(self) -> None:
+        message = Message(codec.MSG_LOST, self.next_seq())
+        for ip in self.participants.active_ips(exclude=self.local_ip, grid_size=self.match_config.grid_size):
+            print("[UdpPeer] Sending unicast lost message to", ip)
+            self.send_reliable(ip, message)
+
+    def receive_participant_list(self, message: Message) -> None:
+        for i, ip in enumerate(message.ips):
+            if ip == self.local_ip:
+                continue
+            udp_port, tcp_port = message.ports[i] if i < len(message.ports) else (0, 0)
+            self.participants.upsert(ip, True, udp_port, tcp_port)
 
     def get_participants(self) -> list:
-        return self.participants
+        # Cópia: o registro é alterado pela thread de rede enquanto a UI o lê
+        return self.participants.snapshot()
+
+    def get_participant_states(self) -> dict:
+        return self.participants.states()
+
+    def get_participants_version(self) -> int:
+        return self.participants.version
+
+    def get_participants_count(self) -> int:
+        # Jogadores desta partida (nós incluídos): quem joga em outro tabuleiro não conta para o timer
+        return len(self.participants.active_ips(grid_size=self.match_config.grid_size))
     
     def get_local_ip(self) -> str:
         return self.local_ip
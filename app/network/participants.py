@@ -0,0 +1,126 @@
+import dataclasses
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.naval_battle.player_model import Player
+
+
+class ParticipantRegistry:
+    # Participantes indexados por IP. `version` muda sempre que a composição
+    # (entrada, saída ou troca de ativo/inativo) muda, para que a UI possa pular trabalho.
+    def __init__(self) -> None:
+        self.by_ip: Dict[str, Player] = {}
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.by_ip)
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self.by_ip
+
+    def __iter__(self) -> Iterator[Player]:
+        return iter(self.snapshot())
+
+    def get(self, ip: str) -> Optional[Player]:
+        return self.by_ip.get(ip)
+
+    def upsert(self, ip: str, active: bool = True, udp_port: int = 0, tcp_port: int = 0) -> Player:
+        # Adiciona ou reativa o jogador; retorna o registro. Portas 0 mantêm as já conhecidas.
+        now = time.monotonic()
+        with self.lock:
+            player = self.by_ip.get(ip)
+            if player is None:
+                player = Player(ip, active, now, udp_port=udp_port, tcp_port=tcp_port)
+                self.by_ip[ip] = player
+                self.version += 1
+            else:
+                if player.active != active:
+                    player.active = active
+                    self.version += 1
+                player.last_seen = now
+                if udp_port:
+                    player.udp_port = udp_port
+                if tcp_port:
+                    player.tcp_port = tcp_port
+            return player
+
+    def set_match_config(self, ip: str, grid_size: int, fleet: Tuple[int, ...]) -> None:
+        with self.lock:
+            player = self.by_ip.get(ip)
+            if player is not None and (player.grid_size, player.fleet) != (grid_size, tuple(fleet)):
+                player.grid_size = grid_size
+                player.fleet = tuple(fleet)
+                # Muda quem é oponente (tabuleiros diferentes não jogam entre si)
+                self.version += 1
+
+    def deactivate(self, ip: str) -> bool:
+        with self.lock:
+            player = self.by_ip.get(ip)
+            if player is None or not player.active:
+                return False
+            player.active = False
+            self.version += 1
+            return True
+
+    def touch(self, ip: str, udp_port: int = 0) -> bool:
+        # Atualiza last_seen (e a porta de origem observada); retorna False se o IP não é conhecido
+        player = self.by_ip.get(ip)
+        if player is None:
+            return False
+        player.last_seen = time.monotonic()
+        if udp_port:
+            player.udp_port = udp_port
+        return True
+
+    def snapshot(self) -> List[Player]:
+        with self.lock:
+            return [dataclasses.replace(p) for p in self.by_ip.values()]
+
+    def states(self) -> Dict[str, bool]:
+        # ip -> ativo, na ordem de entrada
+        with self.lock:
+            return {ip: p.active for ip, p in self.by_ip.items()}
+
+    def ips(self) -> List[str]:
+        with self.lock:
+            return list(self.by_ip.keys())
+
+    def active_ips(self, exclude: Optional[str] = None, grid_size: int = 0) -> List[str]:
+        # grid_size != 0: só jogadores que jogam nesse tamanho de tabuleiro (ver Player.plays_on)
+        with self.lock:
+            return [ip for ip, p in self.by_ip.items()
+                    if p.active and ip != exclude and (not grid_size or p.plays_on(grid_size))]
+
+
+# Atualizações para a janela de jogadores: snapshot completo só na (re)sincronização,
+# depois apenas deltas (entrada, saída, troca de ativo/inativo)
+PLAYERS_SNAPSHOT = "snapshot"
+PLAYERS_DELTA = "delta"
+DELTA_JOIN = "join"
+DELTA_LEAVE = "leave"
+DELTA_ACTIVE = "active"
+
+PlayerDelta = Tuple[str, str, bool]
+
+
+def diff_participants(previous: Dict[str, bool], current: Dict[str, bool]) -> List[PlayerDelta]:
+    deltas: List[PlayerDelta] = []
+    for ip, active in current.items():
+        old = previous.get(ip)
+        if old is None:
+            deltas.append((DELTA_JOIN, ip, active))
+        elif old != active:
+            deltas.append((DELTA_ACTIVE, ip, active))
+    for ip in previous:
+        if ip not in current:
+            deltas.append((DELTA_LEAVE, ip, False))
+    return deltas
+
+
+def apply_participant_deltas(state: Dict[str, bool], deltas: List[PlayerDelta]) -> None:
+    for op, ip, active in deltas:
+        if op == DELTA_LEAVE:
+            state.pop(ip, None)
+        else:
+            state[ip] = active
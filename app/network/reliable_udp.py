@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from app.network.codec import SEQ_MODULO
+
+# Janela de acks seletivos: `ack_bits` cobre as 32 sequências anteriores à confirmada
+ACK_WINDOW = 32
+
+
+def seq_newer(a: int, b: int) -> bool:
+    # a é mais recente que b, considerando a volta do contador de 16 bits
+    diff = (a - b) % SEQ_MODULO
+    return 0 < diff < SEQ_MODULO // 2
+
+
+@dataclass(slots=True)
+class PendingSend:
+    data: bytes
+    first_sent: float
+    last_sent: float
+    retries: int = 0
+
+
+class ReliableChannel:
+    # Estado de entrega confiável com um par: sequência própria, envios aguardando ack,
+    # estimativa de RTT (RFC 6298) e janela de sequências já recebidas para descartar duplicatas.
+    def __init__(self, initial_rto: float = 0.25, min_rto: float = 0.05, max_rto: float = 2.0,
+                 max_retries: int = 8) -> None:
+        self.send_seq = 0
+        self.pending: Dict[int, PendingSend] = {}
+
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_retries = max_retries
+
+        # Recepção: sequência mais recente e bitmask das anteriores já entregues
+        self.remote_latest: Optional[int] = None
+        self.remote_bits = 0
+
+        self.retransmits = 0
+        self.dropped = 0
+
+    def next_seq(self) -> int:
+        self.send_seq = (self.send_seq + 1) % SEQ_MODULO
+        return self.send_seq
+
+    def track(self, seq: int, data: bytes, now: float) -> None:
+        self.pending[seq] = PendingSend(data, now, now)
+
+    # Lado de envio
+    def on_ack(self, seq: int, bits: int, now: float) -> None:
+        self.acknowledge(seq, now)
+        while bits:
+            low = bits & -bits
+            offset = low.bit_length()
+            self.acknowledge((seq - offset) % SEQ_MODULO, now)
+            bits ^= low
+
+    def acknowledge(self, seq: int, now: float) -> None:
+        entry = self.pending.pop(seq, None)
+        if entry is None:
+            return
+        # Algoritmo de Karn: só mede RTT de pacotes que não foram retransmitidos
+        if entry.retries == 0:
+            self.sample_rtt(now - entry.first_sent)
+
+    def sample_rtt(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(self.max_rto, max(self.min_rto, self.srtt + 4 * self.rttvar))
+
+    def due_retransmits(self, now: float) -> List[bytes]:
+        due: List[bytes] = []
+        for seq, entry in list(self.pending.items()):
+            # Backoff exponencial a cada nova tentativa
+            timeout = min(self.max_rto, self.rto * (2 ** entry.retries))
+            if now - entry.last_sent < timeout:
+                continue
+            if entry.retries >= self.max_retries:
+                del self.pending[seq]
+                self.dropped += 1
+                continue
+            entry.retries += 1
+            entry.last_sent = now
+            self.retransmits += 1
+            due.append(entry.data)
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        deadline = None
+        for entry in self.pending.values():
+            at = entry.last_sent + min(self.max_rto, self.rto * (2 ** entry.retries))
+            if deadline is None or at < deadline:
+                deadline = at
+        return deadline
+
+    # Lado de recepção
+    def on_receive(self, seq: int) -> bool:
+        # Registra a sequência recebida; retorna False se for duplicata
+        if self.remote_latest is None:
+            self.remote_latest = seq
+            self.remote_bits = 0
+            return True
+        if seq == self.remote_latest:
+            return False
+        if seq_newer(seq, self.remote_latest):
+            shift = (seq - self.remote_latest) % SEQ_MODULO
+            if shift > ACK_WINDOW:
+                self.remote_bits = 0
+            else:
+                self.remote_bits = ((self.remote_bits << shift) | (1 << (shift - 1))) & 0xFFFFFFFF
+            self.remote_latest = seq
+            return True
+        offset = (self.remote_latest - seq) % SEQ_MODULO
+        if offset > ACK_WINDOW:
+            # Antiga demais para saber; trata como duplicata
+            return False
+        mask = 1 << (offset - 1)
+        if self.remote_bits & mask:
+            return False
+        self.remote_bits |= mask
+        return True
+
+    def ack_state(self) -> Tuple[int, int]:
+        return self.remote_latest or 0, self.remote_bits
@@ -0,0 +1,95 @@
+import socket
+import struct
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional, Tuple
+
+# Layout fixo da tabela em memória compartilhada:
+#   cabeçalho: sequência (uint64) + quantidade de linhas (uint32)
+#   linhas:    IPv4 (4 bytes) + ativo (bool) + score (int32) + last_seen (double)
+HEADER = struct.Struct("<QI4x")
+ROW = struct.Struct("<4s?3xid")
+DEFAULT_CAPACITY = 256
+
+PlayerRow = Tuple[str, bool, int, float]
+
+
+class SharedPlayersTable:
+    # Tabela de participantes lida pela janela de jogadores sem pickling.
+    # A sequência funciona como seqlock: ímpar durante a escrita, par quando consistente.
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool) -> None:
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self.buf = shm.buf
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY) -> "SharedPlayersTable":
+        shm = shared_memory.SharedMemory(create=True, size=HEADER.size + ROW.size * capacity)
+        table = cls(shm, capacity, owner=True)
+        HEADER.pack_into(table.buf, 0, 0, 0)
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPlayersTable":
+        shm = shared_memory.SharedMemory(name=name)
+        capacity = (shm.size - HEADER.size) // ROW.size
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def sequence(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[0]
+
+    def write(self, rows: Iterable[PlayerRow]) -> int:
+        seq, _ = HEADER.unpack_from(self.buf, 0)
+        HEADER.pack_into(self.buf, 0, seq + 1, 0)
+        count = 0
+        for ip, active, score, last_seen in rows:
+            if count >= self.capacity:
+                break
+            try:
+                packed_ip = socket.inet_aton(ip)
+            except OSError:
+                continue
+            ROW.pack_into(self.buf, HEADER.size + count * ROW.size, packed_ip, active, score, last_seen)
+            count += 1
+        HEADER.pack_into(self.buf, 0, seq + 2, count)
+        return seq + 2
+
+    def read(self, retries: int = 100) -> Tuple[int, List[PlayerRow]]:
+        # Retorna (sequência, linhas); repete a leitura se pegou uma escrita pela metade
+        for _ in range(retries):
+            seq, count = HEADER.unpack_from(self.buf, 0)
+            if seq % 2:
+                continue
+            rows: List[PlayerRow] = []
+            for i in range(min(count, self.capacity)):
+                packed_ip, active, score, last_seen = ROW.unpack_from(self.buf, HEADER.size + i * ROW.size)
+                rows.append((socket.inet_ntoa(packed_ip), active, score, last_seen))
+            if HEADER.unpack_from(self.buf, 0)[0] == seq:
+                return seq, rows
+        return -1, []
+
+    def close(self) -> None:
+        self.buf = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except Exception:
+                pass
+
+
+def attach_table(name: Optional[str]) -> Optional[SharedPlayersTable]:
+    if not name:
+        return None
+    try:
+        return SharedPlayersTable.attach(name)
+    except Exception as e:
+        print(f"[SharedPlayersTable] attach failed: {e}")
+        return None
@@ -1,5 +1,6 @@
-# Grid size
+# Grid size (padrão; cada partida pode usar outro, até MAX_GRID_SIZE)
 GRID_SIZE = 10
+MAX_GRID_SIZE = 100
 
 # Orientations
 ORIENT_H = "H"
@@ -8,6 +9,14 @@ ORIENT_V = "V"
 # Empty cell
 EMPTY = 0
 
+# Cores para navios (Porta-aviões, Bombardeiro, Submarino, Lancha militar)
+SHIP_COLORS = [
+    (252, 163, 17),   # laranja quente
+    (59, 130, 246),   # azul
+    (16, 185, 129),   # verde
+    (236, 72, 153),   # rosa
+]
+
 # UI default dimensions
 WINDOW_WIDTH = 940
 WINDOW_HEIGHT = 660
@@ -1,16 +1,26 @@
 import pygame
 from typing import List, Optional
 from app.naval_battle.player_model import Player
+from app.network.participants import PLAYERS_SNAPSHOT, apply_participant_deltas
+from app.network.shared_players import attach_table
 from app.pygame_ui.screens.players_screen import PlayersScreen
+from app.pygame_ui.ui_core.frame_pacer import FramePacer
 
-def run_players_window(players: Optional[List[Player]] = None, local_ip: str = "", update_queue=None) -> None:
+def run_players_window(players: Optional[List[Player]] = None, local_ip: str = "", update_queue=None,
+                       table_name: Optional[str] = None) -> None:
     pygame.init()
     width, height = 380, 300
     surface = pygame.display.set_mode((width, height))
     pygame.display.set_caption("Jogadores Conectados")
-    clock = pygame.time.Clock()
+    # Lista só muda com a tabela/fila: 30 fps com interação, poucas leituras por segundo quando ociosa
+    pacer = FramePacer(active_fps=30, idle_fps=4, background_fps=2)
 
     screen = PlayersScreen(players=players, local_ip=local_ip)
+    # Com memória compartilhada a tela lê a tabela diretamente; senão usa snapshot + deltas da fila
+    table = attach_table(table_name)
+    screen.set_table(table)
+    # Cópia local (ip -> ativo) mantida a partir de snapshot + deltas
+    state = {p.ip: p.active for p in (players or [])}
     try:
         screen.on_enter()
     except Exception:
@@ -18,7 +28,7 @@ def run_players_window(players: Optional[List[Player]] = None, local_ip: str = "
 
     running = True
     while running and screen.running:
-        for event in pygame.event.get():
+        for event in pacer.wait():
             if event.type == pygame.QUIT:
                 running = False
             try:
@@ -26,26 +36,33 @@ def run_players_window(players: Optional[List[Player]] = None, local_ip: str = "
             except Exception:
                 pass
 
-        dt = clock.tick(30) / 1000.0
+        dt = pacer.dt
         try:
             screen.update(dt)
         except Exception:
             pass
 
-        # Consume queued updates to players list
+        # Consume queued updates to players list (snapshot on resync, deltas otherwise)
         if update_queue:
-            latest = None
+            changed = False
             try:
                 while True:
-                    latest = update_queue.get_nowait()
+                    kind, payload = update_queue.get_nowait()
+                    if kind == PLAYERS_SNAPSHOT:
+                        state = dict(payload)
+                    else:
+                        apply_participant_deltas(state, payload)
+                    changed = True
             except Exception:
                 pass
-            if latest is not None:
+            if changed:
                 try:
-                    screen.set_players(latest)
+                    screen.set_players([Player(ip, active) for ip, active in state.items()])
                 except Exception:
                     pass
 
+        if not screen.dirty:
+            continue
         try:
             screen.render(surface)
         except Exception:
@@ -53,4 +70,6 @@ def run_players_window(players: Optional[List[Player]] = None, local_ip: str = "
 
         pygame.display.flip()
 
+    if table is not None:
+        table.close()
     pygame.display.quit()
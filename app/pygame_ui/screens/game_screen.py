@@ -1,12 +1,14 @@
 import pygame
-import random
 import sys
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
 from app.pygame_ui.ui_core.screen import Screen
 import app.pygame_ui.ui_core.theme as theme
 from app.naval_battle.board_model import BoardModel
+from app.naval_battle.game_engine import GameEngine, Outgoing
 from app.pygame_ui.ui_core.button import Button
-from app.naval_battle.ships import SHIP_TYPES
+from app.pygame_ui.ui_core import grid_view
+from app.pygame_ui.ui_core.grid_view import GridBase, HeatLayer, MaskLayer
+from app.pygame_ui.ui_core.dirty_regions import DirtyRegions, draw_clipped, hover_state
 from app.pygame_ui.constants import (
     GRID_SIZE,
     WINDOW_WIDTH,
@@ -14,12 +16,18 @@ from app.pygame_ui.constants import (
     MARGIN,
     TOP_BAR_HEIGHT,
 )
-from app.network.p2p_udp import UdpPeer
+from app.network.network_engine import NetworkEngine
+from app.network import codec
+from app.network.codec import Message
+
+# Itens da legenda antes de resumir o resto como "+k navios"
+LEGEND_MAX_ENTRIES = 6
+
 class GameScreen(Screen):
     def __init__(self, my_board: BoardModel,
                 on_exit_game: Optional[callable] = None,
                 players_count_provider: Optional[callable] = None,
-                udp_peer: UdpPeer = None) -> None:
+                network: Optional[NetworkEngine] = None) -> None:
         # Fonts
         self.title_font = theme.load_font(size=28, bold=True) or pygame.font.SysFont("consolas", 28, bold=True)
         self.sub_font = theme.load_font(size=18, bold=False) or pygame.font.SysFont("consolas", 18)
@@ -30,11 +38,12 @@ class GameScreen(Screen):
 
         # Boards
         self.my_board = my_board
-        self.enemy_board = BoardModel()  # sem embarcações (UI apenas)
+        self.grid_size = n = my_board.grid_size
+        self.enemy_board = BoardModel(n, [])  # sem embarcações (UI apenas)
 
         # Mapa de cores por navio (key -> color) para meu tabuleiro
         self.ship_color_by_key: Dict[str, Tuple[int, int, int]] = {}
-        for idx, st in enumerate(SHIP_TYPES):
+        for idx, st in enumerate(my_board.ship_types):
             self.ship_color_by_key[st.key] = st.color
 
         # Layout baseline
@@ -45,14 +54,14 @@ class GameScreen(Screen):
         # gap entre os grids para não sobrepor coordenadas
         inter_grid_gap = max(MARGIN * 2, 40)
         # dois grids lado a lado, descontando o gap
-        cell_by_width = (horizontal_available - inter_grid_gap) // (2 * GRID_SIZE)
         vertical_available = WINDOW_HEIGHT - (TOP_BAR_HEIGHT + 3 * MARGIN + 120)  # reserva ~120px para painel inferior
-        cell_by_height = vertical_available // GRID_SIZE
-        self.cell = max(36, min(cell_by_width, cell_by_height))
+        # Mínimo de 36px no tabuleiro padrão; tabuleiros maiores encolhem as células até 4px
+        min_cell = min(36, max(4, 36 * GRID_SIZE // n))
+        self.cell = grid_view.cell_size_for(n, (horizontal_available - inter_grid_gap) // 2, vertical_available, min_cell)
 
         # Grids
-        self.grid_w = self.cell * GRID_SIZE
-        self.grid_h = self.cell * GRID_SIZE
+        self.grid_w = self.cell * n
+        self.grid_h = self.cell * n
 
         # Esquerda (meu tabuleiro)
         self.left_grid_x = MARGIN + 10
@@ -76,55 +85,56 @@ class GameScreen(Screen):
             self.on_exit_click,
         )
 
-        # Timer de 10s
-        self.countdown_total = 10.0
-        self.countdown_remaining = self.countdown_total
-
-        # Estado de seleção de tiro
-        self.selected_shot: Optional[Tuple[int, int]] = None
-        self.last_shot = None
+        # Estado da partida (timer de 10s, tiros, navios afundados, placar): a tela só desenha
+        self.engine = GameEngine(my_board)
+
+        # Camadas de tiros (desenho incremental a partir dos bitboards do motor)
+        self.incoming_miss_layer = MaskLayer(n, self.cell, grid_view.draw_miss)
+        self.incoming_hit_layer = MaskLayer(n, self.cell, grid_view.draw_hit_cross)
+        self.shot_miss_layer = MaskLayer(n, self.cell, grid_view.draw_miss)
+        self.shot_hit_layer = MaskLayer(n, self.cell, grid_view.draw_hit_fill)
+        self.heat_layer = HeatLayer(n, self.cell)
+        # Painel, água e eixos pré-renderizados (os dois tabuleiros têm o mesmo tamanho)
+        self.grid_base = GridBase()
+
+        # Tabuleiro inimigo: None = todos os oponentes (mapa de calor) ou o IP de um oponente
+        self.enemy_view: Optional[str] = None
+        self.btn_enemy_view = Button(pygame.Rect(0, 0, 200, 22), "Ver: todos", self.on_cycle_enemy_view)
+        self.participants_version = -1
+        # Participantes com outro tamanho de tabuleiro (ip -> lado): fora da partida, avisados na barra do topo
+        self.mismatched: Dict[str, int] = {}
 
         # Toggle de tiros aleatórios (auto) + botão de alternância (renderizado na barra inferior)
-        self.random_shots_enabled: bool = False
         self.btn_random_toggle = Button(pygame.Rect(0, 0, 160, 34), "Tiros aleatórios: OFF", self.on_toggle_random)
 
-        # Registro de tiros: misses (preto) e hits (vermelho)
-        self.shot_misses: set[Tuple[int, int]] = set()
-        self.shot_hits: set[Tuple[int, int]] = set()
-        # Incoming shots on my board (left grid)
-        self.incoming_shot_misses: set[Tuple[int, int]] = set()
-        self.incoming_shot_hits: set[Tuple[int, int]] = set()
-        self.last_incoming_event: Optional[str] = None
-        # Track incoming hits per ship and sunk status
-        self.incoming_hits_by_ship: Dict[str, set[Tuple[int, int]]] = {}
-        self.sunk_ships_on_my_board: set[str] = set()
-
-        # Score (placeholders)
-        self.shots_made = 0
-        self.hits_received_count = 0
-        self.distinct_players_hit_count = 0
-        self.ships_destroyed_count = 0
-
         # Callback de saída (placeholder)
         self.on_exit_game = on_exit_game
 
         self.running = True
 
-        # Estatísticas por jogador e modal de saída
-        self.hits_by_player: Dict[str, int] = {}
-        self.destroyed_ships_by_player: Dict[str, int] = {}
+        # Modal de saída
         self.exit_modal_open: bool = False
         self.exit_modal_rect = pygame.Rect(WINDOW_WIDTH // 2 - 320, WINDOW_HEIGHT // 2 - 200, 640, 380)
         self.btn_exit_confirm = Button(pygame.Rect(0, 0, 160, 44), "SAIR", self.on_confirm_exit)
         self.btn_exit_cancel = Button(pygame.Rect(0, 0, 160, 44), "Cancelar", self.on_cancel_exit)
 
         # Newtwork
-        self.udp_peer = udp_peer
-        # Game state
-        self.game_over: bool = False
+        self.network = network
+
+        # Regiões redesenhadas só quando o que mostram muda (ver dirty_rects)
+        self.dirty = DirtyRegions()
+        split_x = (self.left_grid_rect.right + self.right_grid_x) // 2
+        # Abaixo da linha de 2px que fecha a barra do topo
+        regions_top = self.top_bar_rect.bottom + 2
+        self.left_region_rect = pygame.Rect(0, regions_top, split_x, self.bottom_rect.y - regions_top)
+        self.right_region_rect = pygame.Rect(split_x, regions_top, WINDOW_WIDTH - split_x, self.bottom_rect.y - regions_top)
 
     def on_enter(self) -> None:
         pygame.display.set_caption("Batalha Naval - Jogo")
+        self.dirty.invalidate()
+
+    def invalidate(self) -> None:
+        self.dirty.invalidate()
 
     def on_exit(self) -> None:
         pass
@@ -145,49 +155,52 @@ class GameScreen(Screen):
         if event.type == pygame.QUIT:
             self.running = False
             return
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+            self.on_cycle_enemy_view()
+            return
         if event.type == pygame.MOUSEBUTTONDOWN:
             # Botões
             self.btn_exit.handle_event(event)
             self.btn_random_toggle.handle_event(event)
+            self.btn_enemy_view.handle_event(event)
             # Seleção no tabuleiro inimigo 
             if event.button == 1:
                 gcoords = self.grid_coords_from_pos(event.pos, right=True)
                 if gcoords:
-                    self.selected_shot = gcoords
+                    self.engine.select_shot(gcoords)
 
     def update(self, dt: float) -> None:
+        # Oponentes atuais (cada um com seu registro de tiros no motor)
+        if self.network:
+            version = self.network.get_participants_version()
+            if version != self.participants_version:
+                self.participants_version = version
+                self.engine.set_opponents(self.network.get_opponent_fleets())
+                self.mismatched = self.network.get_mismatched_peers()
         # Pausa o jogo se o modal de saída estiver aberto
         if self.exit_modal_open:
             return
-        # Se o jogo terminou, não processa mais tiros/temporizador
-        if getattr(self, "game_over", False):
-            return
-        # Atualiza timer e dispara tiro a cada 10s
-        # Pausa o contador se houver menos de 2 jogadores conectados
-        if self.players_count_provider:
-            if self.players_count_provider() < 2:
-                return
-          
-        self.countdown_remaining -= dt
-        if self.countdown_remaining <= 0.0:
-            # Se não há seleção e modo aleatório está ON, escolha uma posição para atirar
-            if self.selected_shot is None and self.random_shots_enabled:
-                self.selected_shot = (random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1))
-
-            # Dispara o tiro se houver uma posição selecionada (manual ou aleatória)
-            if self.selected_shot is not None:
-                self.execute_shot()
-
-            # Reinicia ciclo do timer
-            self.countdown_remaining = self.countdown_total
-
-            # Pré-seleciona próxima posição apenas se aleatório estiver ON
-            if self.random_shots_enabled:
-                self.selected_shot = (random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1))
+        # O motor pausa o contador com menos de 2 jogadores e para após o fim de jogo
+        players_count = self.players_count_provider() if self.players_count_provider else 2
+        self.dispatch(self.engine.tick(dt, players_count))
 
     def render(self, surface) -> None:
-        surface.fill(theme.COLOR_BG)
         mouse_pos = pygame.mouse.get_pos()
+        changed = self.dirty.take_changed()
+        if changed is not None and "screen" not in changed:
+            # Só as regiões que mudaram (ver dirty_rects); o resto do back buffer já está certo
+            draws = {
+                "top": (self.top_bar_rect, lambda: self.draw_top_bar(surface)),
+                "left": (self.left_region_rect, lambda: self.draw_grid_left(surface)),
+                "right": (self.right_region_rect, lambda: self.draw_grid_right(surface)),
+                "bottom": (self.bottom_rect, lambda: self.draw_bottom_panel(surface, mouse_pos)),
+            }
+            for name in changed:
+                rect, draw = draws[name]
+                draw_clipped(surface, rect, theme.COLOR_BG, draw)
+            return
+
+        surface.fill(theme.COLOR_BG)
         self.draw_top_bar(surface)
         self.draw_grid_left(surface)
         self.draw_grid_right(surface)
@@ -197,6 +210,36 @@ class GameScreen(Screen):
         if self.exit_modal_open:
             self.draw_exit_modal(surface, mouse_pos)
 
+    def dirty_rects(self) -> Optional[List[pygame.Rect]]:
+        # Estado visível de cada região; o contador só conta como mudança quando o segundo exibido muda
+        mouse_pos = pygame.mouse.get_pos()
+        engine = self.engine
+        players = self.players_count_provider() if self.players_count_provider else 2
+        full_rect = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        modal = None
+        if self.exit_modal_open:
+            # O resumo do modal muda com eventos de rede enquanto ele está aberto
+            hits_received, hits_by_player, destroyed, final_score = self.compute_score()
+            modal = (hover_state(self.exit_modal_rect, mouse_pos), hits_received,
+                     tuple(sorted(hits_by_player.items())), destroyed, final_score)
+        regions = {
+            "screen": (full_rect, (self.exit_modal_open, modal)),
+            "top": (self.top_bar_rect, (engine.game_over, players >= 2, tuple(sorted(self.mismatched.items())),
+                                        hover_state(self.btn_exit.rect, mouse_pos))),
+            "left": (self.left_region_rect, (self.my_board.hit_mask, engine.incoming_miss_mask)),
+            "right": (self.right_region_rect, (engine.shot_mask, engine.hits_version, engine.selected_shot,
+                                               self.enemy_view, hover_state(self.btn_enemy_view.rect, mouse_pos))),
+            "bottom": (self.bottom_rect, (int(engine.countdown_remaining), engine.selected_shot,
+                                          self.btn_random_toggle.label, engine.shots_made, engine.hits_received_count,
+                                          engine.ships_destroyed_count, hover_state(self.btn_random_toggle.rect, mouse_pos))),
+        }
+        rects = self.dirty.collect(regions)
+        if rects and self.exit_modal_open:
+            # O modal fica por cima de todas as regiões: qualquer mudança redesenha a tela inteira
+            self.dirty.changed = None
+            return [full_rect]
+        return rects
+
     # Helpers de grid/coords
     def grid_coords_from_pos(self, pos: Tuple[int, int], right: bool) -> Optional[Tuple[int, int]]:
         x, y = pos
@@ -214,7 +257,7 @@ class GameScreen(Screen):
                                 (40, 60, 100), (20, 30, 50))
         pygame.draw.line(surface, theme.COLOR_PANEL_BORDER, (0, self.top_bar_rect.bottom), (WINDOW_WIDTH, self.top_bar_rect.bottom), 2)
         # Define o status do jogo ao lado do título
-        if getattr(self, "game_over", False):
+        if self.engine.game_over:
             status = "Fim de Jogo!"
         else:
             status = "Em Execução!"
@@ -225,7 +268,7 @@ class GameScreen(Screen):
                     # Em caso de erro no provider, mantém o padrão "Em Execução!"
                     pass
         title = f"Batalha Naval - {status}"
-        title_surf = self.title_font.render(title, True, theme.COLOR_TITLE)
+        title_surf = theme.render_text(self.title_font, title, theme.COLOR_TITLE)
         surface.blit(title_surf, (MARGIN, 20))
 
         # Botão sair no final da linha do título (topo, à direita)
@@ -236,37 +279,35 @@ class GameScreen(Screen):
         self.btn_exit.rect.x = self.top_bar_rect.right - pad - btn_w
         self.btn_exit.rect.y = self.top_bar_rect.y + (TOP_BAR_HEIGHT - btn_h) // 2
         self.btn_exit.draw(surface, self.list_font, pygame.mouse.get_pos())
+        self.draw_mismatch_notice(surface, self.btn_exit.rect.x - pad)
+
+    def draw_mismatch_notice(self, surface, right: int) -> None:
+        # Aviso à esquerda do botão sair: quem ficou fora da partida por usar outro tabuleiro
+        if not self.mismatched:
+            return
+        ips = sorted(self.mismatched)
+        first = f"{ips[0]} ({self.mismatched[ips[0]]}x{self.mismatched[ips[0]]})"
+        more = f" +{len(ips) - 1}" if len(ips) > 1 else ""
+        lines = [f"Fora da partida (tabuleiro diferente de {self.grid_size}x{self.grid_size}):", first + more]
+        y = self.top_bar_rect.y + 14
+        for text in lines:
+            surf = theme.render_text(self.small_font, text, theme.HIT_COLOR)
+            surface.blit(surf, (right - surf.get_width(), y))
+            y += surf.get_height() + 2
 
     def draw_grid_base(self, surface, rect, grid_x, grid_y, reveal_ships: bool, board: BoardModel):
-        # painel base
-        theme.draw_rounded_rect(surface, theme.COLOR_PANEL_BG, rect, radius=8, border=theme.COLOR_PANEL_BORDER)
-        # células
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                cell_rect = pygame.Rect(grid_x + x * self.cell + 1, grid_y + y * self.cell + 1, self.cell - 2, self.cell - 2)
-                base_color = theme.COLOR_WATER_ALT if (x + y) % 2 else theme.COLOR_WATER
-                pygame.draw.rect(surface, base_color, cell_rect, border_radius=6)
-                pygame.draw.rect(surface, theme.COLOR_GRID, cell_rect, 1, border_radius=6)
+        # painel, células e eixos (camada estática em cache)
+        self.grid_base.render(surface, self.small_font, grid_x, grid_y, board.grid_size, self.cell)
         # navios (apenas se reveal_ships)
         if reveal_ships:
             for pl in board.placements.values():
-                for (x, y) in pl.cells:
-                    color = self.ship_color_by_key.get(pl.key, theme.SHIP_COLORS[0])
-                    rect_cell = pygame.Rect(grid_x + x * self.cell + 1, grid_y + y * self.cell + 1, self.cell - 2, self.cell - 2)
-                    pygame.draw.rect(surface, color, rect_cell, border_radius=6)
-                    pygame.draw.rect(surface, theme.COLOR_GRID_ACCENT, rect_cell, 2, border_radius=6)
-        # eixos
-        axis_font = self.small_font
-        for i in range(GRID_SIZE):
-            xs = axis_font.render(str(i), True, theme.COLOR_TEXT_MUTED)
-            ys = axis_font.render(str(i), True, theme.COLOR_TEXT_MUTED)
-            surface.blit(xs, (grid_x + i * self.cell + self.cell // 2 - xs.get_width() // 2, grid_y - 18))
-            surface.blit(ys, (grid_x - 18, grid_y + i * self.cell + self.cell // 2 - ys.get_height() // 2))
+                color = self.ship_color_by_key.get(pl.key, theme.SHIP_COLORS[0])
+                grid_view.draw_ship(surface, grid_x, grid_y, self.cell, pl, color)
 
     def draw_grid_left(self, surface):
         # título acima do grid esquerdo
         title = "Meu Tabuleiro"
-        t_surf = self.list_font.render(title, True, theme.COLOR_TITLE)
+        t_surf = theme.render_text(self.list_font, title, theme.COLOR_TITLE)
         # Posiciona o título acima do eixo X, sem sobrepor os números
         t_h = t_surf.get_height()
         axis_y = self.left_grid_y - 18  # y das coordenadas do eixo X
@@ -275,21 +316,16 @@ class GameScreen(Screen):
         surface.blit(t_surf, (self.left_grid_x, y_title))
         self.draw_grid_base(surface, self.left_grid_rect, self.left_grid_x, self.left_grid_y, True, self.my_board)
         # Overlay incoming shots: misses (gray) and hits (red X)
-        for (sx, sy) in getattr(self, "incoming_shot_misses", set()):
-            r = pygame.Rect(self.left_grid_x + sx * self.cell + 1, self.left_grid_y + sy * self.cell + 1, self.cell - 2, self.cell - 2)
-            pygame.draw.rect(surface, (110, 114, 120), r, border_radius=6)  # gray
-        for (hx, hy) in getattr(self, "incoming_shot_hits", set()):
-            x0 = self.left_grid_x + hx * self.cell + 4
-            y0 = self.left_grid_y + hy * self.cell + 4
-            x1 = x0 + self.cell - 8
-            y1 = y0 + self.cell - 8
-            pygame.draw.line(surface, (200, 40, 40), (x0, y0), (x1, y1), 3)
-            pygame.draw.line(surface, (200, 40, 40), (x0, y1), (x1, y0), 3)
+        pos = (self.left_grid_x, self.left_grid_y)
+        self.incoming_miss_layer.sync(self.engine.incoming_miss_mask)
+        self.incoming_miss_layer.blit(surface, pos)
+        self.incoming_hit_layer.sync(self.my_board.hit_mask)
+        self.incoming_hit_layer.blit(surface, pos)
 
     def draw_grid_right(self, surface):
         # título acima do grid direito
         title = "Tabuleiro Inimigo"
-        t_surf = self.list_font.render(title, True, theme.COLOR_TITLE)
+        t_surf = theme.render_text(self.list_font, title, theme.COLOR_TITLE)
         # Posiciona o título acima do eixo X, sem sobrepor os números
         t_h = t_surf.get_height()
         axis_y = self.right_grid_y - 18  # y das coordenadas do eixo X
@@ -297,18 +333,33 @@ class GameScreen(Screen):
         y_title = max(self.top_bar_rect.bottom + 6, y_title)
         surface.blit(t_surf, (self.right_grid_x, y_title))
         self.draw_grid_base(surface, self.right_grid_rect, self.right_grid_x, self.right_grid_y, False, self.enemy_board)
-        # sobreposições de tiros: misses (preto) e hits (vermelho)
-        for (sx, sy) in self.shot_misses:
-            r = pygame.Rect(self.right_grid_x + sx * self.cell + 1, self.right_grid_y + sy * self.cell + 1, self.cell - 2, self.cell - 2)
-            pygame.draw.rect(surface, (110, 114, 120), r, border_radius=6)  # cinza
-        for (hx, hy) in self.shot_hits:
-            r = pygame.Rect(self.right_grid_x + hx * self.cell + 1, self.right_grid_y + hy * self.cell + 1, self.cell - 2, self.cell - 2)
-            pygame.draw.rect(surface, (200, 40, 40), r, border_radius=6)     # vermelho
+        # Seletor de oponente na ponta direita da linha do título
+        self.btn_enemy_view.rect.right = self.right_grid_rect.right
+        self.btn_enemy_view.rect.bottom = axis_y - 1
+        self.btn_enemy_view.draw(surface, self.small_font, pygame.mouse.get_pos())
+        # sobreposições de tiros: misses (cinza) e hits (vermelho) do oponente escolhido,
+        # ou de todos com os acertos como mapa de calor
+        pos = (self.right_grid_x, self.right_grid_y)
+        ledger = self.engine.opponents.get(self.enemy_view) if self.enemy_view is not None else None
+        if ledger is not None:
+            self.shot_miss_layer.sync(ledger.miss_mask)
+            self.shot_miss_layer.blit(surface, pos)
+            self.shot_hit_layer.sync(ledger.hit_mask)
+            self.shot_hit_layer.blit(surface, pos)
+        else:
+            self.shot_miss_layer.sync(self.engine.shot_miss_mask)
+            self.shot_miss_layer.blit(surface, pos)
+            self.heat_layer.sync(self.engine.hits_version, self.engine.hit_counts)
+            self.heat_layer.blit(surface, pos)
         # destaque de seleção atual
-        if self.selected_shot:
-            sx, sy = self.selected_shot
-            rect_sel = pygame.Rect(self.right_grid_x + sx * self.cell + 2, self.right_grid_y + sy * self.cell + 2, self.cell - 4, self.cell - 4)
-            pygame.draw.rect(surface, theme.COLOR_HOVER, rect_sel, 3, border_radius=8)
+        if self.engine.selected_shot:
+            sx, sy = self.engine.selected_shot
+            rect_sel = pygame.Rect(self.right_grid_x + sx * self.cell, self.right_grid_y + sy * self.cell, self.cell, self.cell)
+            if self.cell >= grid_view.DETAIL_CELL_PX:
+                pygame.draw.rect(surface, theme.COLOR_HOVER, rect_sel.inflate(-4, -4), 3, border_radius=8)
+            else:
+                # Célula pequena: moldura maior que a célula para continuar visível
+                pygame.draw.rect(surface, theme.COLOR_HOVER, rect_sel.inflate(6, 6), 2)
 
     def draw_bottom_panel(self, surface, mouse_pos):
         # base
@@ -322,7 +373,7 @@ class GameScreen(Screen):
         base_y = self.bottom_rect.y + pad
 
         # Legenda (meus navios) na esquerda, em duas colunas
-        legend_title = self.sub_font.render("Legenda (meus navios)", True, theme.COLOR_TITLE)
+        legend_title = theme.render_text(self.sub_font, "Legenda (meus navios)", theme.COLOR_TITLE)
         surface.blit(legend_title, (content_left, base_y))
         y = base_y + 28
         # duas colunas dentro da área da esquerda
@@ -331,31 +382,37 @@ class GameScreen(Screen):
         inner_col_w = (legend_area_w - col_gap) // 2
         col1_x = content_left
         col2_x = content_left + inner_col_w + col_gap
-        # dividir lista em duas metades
-        half = (len(SHIP_TYPES) + 1) // 2
-        for i, st in enumerate(SHIP_TYPES[:half]):
+        # dividir lista em duas metades (frotas grandes: até LEGEND_MAX_ENTRIES itens e um "+k")
+        ship_types = self.my_board.ship_types[:LEGEND_MAX_ENTRIES]
+        half = (len(ship_types) + 1) // 2
+        for i, st in enumerate(ship_types[:half]):
             box = pygame.Rect(col1_x, y + i * 28, 22, 22)
             pygame.draw.rect(surface, st.color, box, border_radius=4)
-            name = self.small_font.render(st.name, True, theme.COLOR_TEXT)
+            name = theme.render_text(self.small_font, st.name, theme.COLOR_TEXT)
             surface.blit(name, (col1_x + 28, y + i * 28 + 2))
-        for j, st in enumerate(SHIP_TYPES[half:]):
+        for j, st in enumerate(ship_types[half:]):
             box = pygame.Rect(col2_x, y + j * 28, 22, 22)
             pygame.draw.rect(surface, st.color, box, border_radius=4)
-            name = self.small_font.render(st.name, True, theme.COLOR_TEXT)
+            name = theme.render_text(self.small_font, st.name, theme.COLOR_TEXT)
             surface.blit(name, (col2_x + 28, y + j * 28 + 2))
+        hidden = len(self.my_board.ship_types) - len(ship_types)
+        if hidden > 0:
+            more = theme.render_text(self.small_font, f"+{hidden} navios", theme.COLOR_TEXT_MUTED)
+            surface.blit(more, (content_left + legend_title.get_width() + 12, base_y + 4))
 
         # Timer + seleção centralizados (apenas segundos em vermelho)
         timer_prefix = "Próximo tiro em:"
-        prefix_surf = self.list_font.render(timer_prefix, True, theme.COLOR_TITLE)
-        secs_text = f" {int(self.countdown_remaining)}s"
-        secs_surf = self.list_font.render(secs_text, True, (200, 40, 40))
+        prefix_surf = theme.render_text(self.list_font, timer_prefix, theme.COLOR_TITLE)
+        secs_text = f" {int(self.engine.countdown_remaining)}s"
+        secs_surf = theme.render_text(self.list_font, secs_text, (200, 40, 40))
         mid_total_w = prefix_surf.get_width() + secs_surf.get_width()
         mid_start_x = self.bottom_rect.centerx - (mid_total_w // 2)
         surface.blit(prefix_surf, (mid_start_x, base_y))
         surface.blit(secs_surf, (mid_start_x + prefix_surf.get_width(), base_y))
 
-        sel_text = f"Posição: {self.selected_shot if self.selected_shot else '(nenhuma)'}"
-        s_surf = self.sub_font.render(sel_text, True, theme.COLOR_TEXT)
+        selected = self.engine.selected_shot
+        sel_text = f"Posição: {selected if selected else '(nenhuma)'}"
+        s_surf = theme.render_text(self.sub_font, sel_text, theme.COLOR_TEXT)
         surface.blit(s_surf, (self.bottom_rect.centerx - s_surf.get_width() // 2, base_y + 28))
 
         # Toggle abaixo da posição (centralizado)
@@ -368,63 +425,38 @@ class GameScreen(Screen):
 
         # Score na direita (bloco à direita; textos alinhados à esquerda dentro do bloco)
         score_lines = [
-            f"Tiros: {self.shots_made}",
-            f"Atingido: {self.hits_received_count}",
-            f"Destruídos: {self.ships_destroyed_count}",
+            f"Tiros: {self.engine.shots_made}",
+            f"Atingido: {self.engine.hits_received_count}",
+            f"Destruídos: {self.engine.ships_destroyed_count}",
         ]
         # Alinhar os textos de score mais à direita mantendo o mesmo espaçamento da borda
-        widths = [self.sub_font.render(line, True, theme.COLOR_TEXT).get_width() for line in score_lines]
-        max_w = max(widths) if widths else 0
+        score_surfs = [theme.render_text(self.sub_font, line, theme.COLOR_TEXT) for line in score_lines]
+        max_w = max(ls.get_width() for ls in score_surfs) if score_surfs else 0
         start_x = content_right - max_w  # borda direita menos a largura máxima
         y_score = base_y
-        for line in score_lines:
-            ls = self.sub_font.render(line, True, theme.COLOR_TEXT)
+        for ls in score_surfs:
             surface.blit(ls, (start_x, y_score))
             y_score += 28
 
-    # Ação de "atirar" automática a cada 10s
-    def execute_shot(self) -> None:
-        self.last_shot = self.selected_shot
-
-        # Se não há posição selecionada, escolha aleatória
-        if not self.selected_shot:
-            self.selected_shot = (random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1))
-
-        sx, sy = self.selected_shot
-        print(f"[GameScreen] Executando tiro em {self.selected_shot}.")
-        # Por padrão, marca como miss (preto). Integrações futuras podem chamar register_shot_result(True).
-        self.shot_misses.add(self.selected_shot)
-        self.shots_made += 1
-
-        msg = f"shot:{sx},{sy}"
-        self.udp_peer.send_shot_unicast(msg)
-
-    # Permite registrar resultado de tiro (para UI de acerto em vermelho)
-    def register_shot_result(self, hit: bool) -> None:
-        if not self.selected_shot:
-            return
-        if hit:
-            self.shot_hits.add(self.selected_shot)
-            # remove de misses se houver
-            if self.selected_shot in self.shot_misses:
-                self.shot_misses.discard(self.selected_shot)
+    # Executa as ações pedidas pelo motor (tiros e avisos) pela thread de rede
+    def dispatch(self, actions: List[Outgoing]) -> None:
+        if self.network and actions:
+            self.network.perform(actions)
 
     def on_toggle_random(self) -> None:
         # Alterna o modo de tiros automáticos (random shots)
-        self.random_shots_enabled = not self.random_shots_enabled
-        self.btn_random_toggle.label = "Tiros aleatórios: ON" if self.random_shots_enabled else "Tiros aleatórios: OFF"
-        # Se acabou de ligar o modo aleatório, já mostra uma posição aleatória selecionada
-        if self.random_shots_enabled and self.selected_shot is None:
-            self.selected_shot = (random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1))
+        self.engine.set_random_shots(not self.engine.random_shots_enabled)
+        self.btn_random_toggle.label = "Tiros aleatórios: ON" if self.engine.random_shots_enabled else "Tiros aleatórios: OFF"
+
+    def on_cycle_enemy_view(self) -> None:
+        # Alterna entre todos os oponentes (mapa de calor) e cada oponente individualmente
+        views: List[Optional[str]] = [None] + sorted(self.engine.opponents)
+        index = views.index(self.enemy_view) if self.enemy_view in views else 0
+        self.enemy_view = views[(index + 1) % len(views)]
+        self.btn_enemy_view.label = "Ver: todos" if self.enemy_view is None else f"Ver: {self.enemy_view}"
 
     def compute_score(self) -> Tuple[int, Dict[str, int], int, int]:
-        # hits_received, hits_by_player, distinct_players_hit, final_score
-        hits_received = self.hits_received_count
-        hits_by_player = dict(self.hits_by_player)
-        distinct_players_hit = len([ip for ip, c in hits_by_player.items() if c > 0])
-        destroyed = len([ip for ip, c in self.destroyed_ships_by_player.items() if c > 0])
-        final_score = distinct_players_hit - hits_received
-        return hits_received, hits_by_player, destroyed, final_score
+        return self.engine.compute_score()
 
     def layout_exit_modal_buttons(self):
         btn_gap = 20
@@ -438,16 +470,14 @@ class GameScreen(Screen):
 
     def draw_exit_modal(self, surface, mouse_pos):
         # Overlay escurecido
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 160))
-        surface.blit(overlay, (0, 0))
+        surface.blit(theme.overlay_surface((WINDOW_WIDTH, WINDOW_HEIGHT), (0, 0, 0, 160)), (0, 0))
 
         rect = self.exit_modal_rect
         theme.draw_rounded_rect(surface, theme.COLOR_PANEL_BG, rect, radius=12, border=theme.COLOR_PANEL_BORDER)
 
         # Título
         title = "Resumo da Partida"
-        title_surf = self.title_font.render(title, True, theme.COLOR_TITLE)
+        title_surf = theme.render_text(self.title_font, title, theme.COLOR_TITLE)
         surface.blit(title_surf, (rect.x + 20, rect.y + 16))
 
         # Conteúdo
@@ -456,29 +486,29 @@ class GameScreen(Screen):
         line_gap = 26
 
         # Quantidade de vezes que foi atingido
-        l1 = self.sub_font.render(f"Você foi atingido: {hits_received} vez(es)", True, theme.COLOR_TEXT)
+        l1 = theme.render_text(self.sub_font, f"Você foi atingido: {hits_received} vez(es)", theme.COLOR_TEXT)
         surface.blit(l1, (rect.x + 20, y))
         y += line_gap
 
         # Quantidade de acertos por jogador
-        l2 = self.sub_font.render("Acertos por jogador:", True, theme.COLOR_TEXT)
+        l2 = theme.render_text(self.sub_font, "Acertos por jogador:", theme.COLOR_TEXT)
         surface.blit(l2, (rect.x + 20, y))
         y += line_gap
 
         if hits_by_player:
             # Lista IP -> contagem
             for ip, cnt in hits_by_player.items():
-                line = self.small_font.render(f"- {ip}: {cnt} acerto(s)", True, theme.COLOR_TEXT)
+                line = theme.render_text(self.small_font, f"- {ip}: {cnt} acerto(s)", theme.COLOR_TEXT)
                 surface.blit(line, (rect.x + 36, y))
                 y += 22
         else:
-            none_line = self.small_font.render("- Nenhum jogador atingido", True, theme.COLOR_TEXT_MUTED)
+            none_line = theme.render_text(self.small_font, "- Nenhum jogador atingido", theme.COLOR_TEXT_MUTED)
             surface.blit(none_line, (rect.x + 36, y))
             y += 22
 
         # Score final (destaque)
         y += 8
-        score_text = self.list_font.render(f"Score Final: {final_score}  (Jogadores atingidos: {self.distinct_players_hit_count} - Atingido: {hits_received})", True, theme.COLOR_TITLE)
+        score_text = theme.render_text(self.list_font, f"Score Final: {final_score}  (Jogadores atingidos: {self.engine.distinct_players_hit_count} - Atingido: {hits_received})", theme.COLOR_TITLE)
         surface.blit(score_text, (rect.x + 20, y))
         y += line_gap + 6
 
@@ -514,100 +544,16 @@ class GameScreen(Screen):
     def on_cancel_exit(self) -> None:
         self.exit_modal_open = False
 
-    def register_incoming_hit(self, from_ip: str | None = None) -> None:
-        # Incrementa contador de vezes que fui atingido
-        self.hits_received_count += 1
-
-    def register_outgoing_hit(self, player_ip: str) -> None:
-        self.hits_by_player[player_ip] = self.hits_by_player.get(player_ip, 0) + 1
-        self.distinct_players_hit_count = len([ip for ip, c in self.hits_by_player.items() if c > 0])
-        self.shot_hits.add(self.last_shot)
-
-    def register_outgoing_destroyed(self, player_ip: str) -> None:
-        self.destroyed_ships_by_player[player_ip] = self.destroyed_ships_by_player.get(player_ip, 0) + 1
-
-    def handle_network_event(self, addr, msg) -> None:
-        print(f"[GameScreen] Received message from {addr}: {msg}")
-        
-        if msg.startswith("shot:"):
-            self.handle_incoming_shot(addr, msg)
-        elif msg == "hit":
-            self.register_outgoing_hit(addr[0])
+    def handle_network_event(self, addr, message: Message) -> None:
+        print(f"[GameScreen] Received message from {addr}: {message.kind}")
+
+        if message.kind == codec.MSG_SHOT:
+            self.dispatch(self.engine.on_shot(addr[0], message.x, message.y))
+        elif message.kind == codec.MSG_HIT:
+            self.dispatch(self.engine.on_hit(addr[0]))
             print(f"[GameScreen] Registered outgoing hit on enemy board at {addr}")
-        elif msg == "destroyed":
-            self.register_outgoing_destroyed(addr[0])
+        elif message.kind == codec.MSG_DESTROYED:
+            self.dispatch(self.engine.on_destroyed(addr[0]))
             print(f"[GameScreen] Enemy ship destroyed notification from {addr}")
-
-    def parse_shot_message(self, msg: str) -> Optional[Tuple[int, int]]:
-        payload = msg[5:].strip()
-        x_str, y_str = payload.split(",", 1)
-        x = int(x_str)
-        y = int(y_str)
-        return x, y
-
-    def is_hit_on_my_board(self, x: int, y: int) -> bool:
-        return (x, y) in self.my_board.occupied()
-
-    def find_ship_key_at(self, x: int, y: int) -> Optional[str]:
-        # Returns the ship key occupying (x, y) on my_board, if any
-        for key, pl in self.my_board.placements.items():
-            if (x, y) in pl.cells:
-                return key
-        return None
-
-    def check_end_of_game(self) -> None:
-        # Verifica se todas as embarcações do meu tabuleiro foram destruídas
-        total = len(self.my_board.placements)
-        if total > 0 and len(self.sunk_ships_on_my_board) >= total:
-            if not getattr(self, "game_over", False):
-                self.game_over = True
-                self.udp_peer.send_lost_unicast("lost")
-
-    def record_incoming_hit(self, x: int, y: int, addr) -> None:
-        self.incoming_shot_hits.add((x, y))
-        self.register_incoming_hit()
-        # Track hit per ship and detect sunk
-        ship_key = self.find_ship_key_at(x, y)
-        if ship_key:
-            hits = self.incoming_hits_by_ship.get(ship_key)
-            if hits is None:
-                hits = set()
-                self.incoming_hits_by_ship[ship_key] = hits
-            hits.add((x, y))
-
-            # Notify attacker of hit
-            try:
-                if self.udp_peer and getattr(self.udp_peer, "tcp_peer", None):
-                    self.udp_peer.tcp_peer.send_message(addr[0], 5001, "hit")
-            except Exception:
-                pass
-
-            # Check sunk: all cells of this ship were hit
-            ship_cells = self.my_board.placements.get(ship_key).cells if ship_key in self.my_board.placements else set()
-            if ship_cells and hits.issuperset(ship_cells) and ship_key not in self.sunk_ships_on_my_board:
-                self.sunk_ships_on_my_board.add(ship_key)
-                self.last_incoming_event = f"sunk:{ship_key}"
-                print(f"[GameScreen] SUNK ship '{ship_key}' on my board by {addr}")
-                # Notify attacker of hit (sunk)
-                try:
-                    if self.udp_peer and getattr(self.udp_peer, "tcp_peer", None):
-                        self.udp_peer.tcp_peer.send_message(addr[0], 5001, "destroyed")
-                except Exception:
-                    pass
-                # Verifica fim de jogo após afundar um navio
-                self.check_end_of_game()
-
-        print(f"[GameScreen] HIT on my board at ({x},{y}) from {addr}")
-
-    def record_incoming_miss(self, x: int, y: int, addr) -> None:
-        self.incoming_shot_misses.add((x, y))
-        print(f"[GameScreen] MISS on my board at ({x},{y}) from {addr}")
-
-    def handle_incoming_shot(self, addr, msg) -> bool:
-        coords = self.parse_shot_message(msg)
-     
-        x, y = coords
-        if self.is_hit_on_my_board(x, y):
-            self.record_incoming_hit(x, y, addr)
-        else:
-            self.record_incoming_miss(x, y, addr)
+        elif message.kind == codec.MSG_LOST:
+            self.dispatch(self.engine.on_lost(addr[0]))
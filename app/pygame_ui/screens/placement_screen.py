@@ -1,9 +1,9 @@
 import pygame
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
 from app.pygame_ui.ui_core.screen import Screen
 from app.pygame_ui.ui_core import theme
 from app.naval_battle.board_model import BoardModel
-from app.naval_battle.ships import SHIP_TYPES
+from app.pygame_ui.ui_core import grid_view
 from app.pygame_ui.constants import (
     GRID_SIZE,
     WINDOW_WIDTH,
@@ -14,6 +14,10 @@ from app.pygame_ui.constants import (
     ORIENT_H
 )
 from app.pygame_ui.ui_core.button import Button
+from app.pygame_ui.ui_core.dirty_regions import DirtyRegions, draw_clipped, hover_state
+
+# Height of each ship list row (44px row + spacing)
+SHIP_ROW_STEP = 52
 
 class PlacementScreen(Screen):
     def __init__(self, board: Optional[BoardModel] = None, on_start_game: Optional[callable] = None):
@@ -26,17 +30,21 @@ class PlacementScreen(Screen):
         # Layout baseline
         self.top_bar_rect = pygame.Rect(0, 0, WINDOW_WIDTH, TOP_BAR_HEIGHT)
 
-        # Adaptive cell size to minimize empty space
-        self.cell = min(
-            (WINDOW_WIDTH - SIDEBAR_WIDTH - 2 * MARGIN) // GRID_SIZE,
-            (WINDOW_HEIGHT - (TOP_BAR_HEIGHT + 2 * MARGIN)) // GRID_SIZE,
+        # Game variables
+        self.board = board if board is not None else BoardModel()
+        n = self.board.grid_size
+
+        # Adaptive cell size to minimize empty space (36px minimum on the default board)
+        self.cell = grid_view.cell_size_for(
+            n,
+            WINDOW_WIDTH - SIDEBAR_WIDTH - 2 * MARGIN,
+            WINDOW_HEIGHT - (TOP_BAR_HEIGHT + 2 * MARGIN),
+            min(36, max(4, 36 * GRID_SIZE // n)),
         )
-        if self.cell < 36:
-            self.cell = 36
 
         # Grid rect
-        self.grid_w = self.cell * GRID_SIZE
-        self.grid_h = self.cell * GRID_SIZE
+        self.grid_w = self.cell * n
+        self.grid_h = self.cell * n
         # Pequeno espaçamento extra no topo e à esquerda para não encostar nos limites
         self.grid_x = MARGIN + 12
         self.grid_y = TOP_BAR_HEIGHT + MARGIN + 12
@@ -74,17 +82,29 @@ class PlacementScreen(Screen):
         # Ship list area
         self.ship_list_rect = pygame.Rect(self.sidebar_x + 16, self.sidebar_y + 176, btn_w, self.grid_h - 200)
 
-        # Clickable rects for ships
+        # Clickable rects for ships (only rows visible in the list) and list scroll offset
         self.ship_row_rects: Dict[str, pygame.Rect] = {}
+        self.list_scroll = 0
+        self.list_view_rect = self.ship_list_rect.copy()
+
+        # Static grid layer (panel, water, axis labels), rebuilt only when the layout or theme changes
+        self.grid_base = grid_view.GridBase()
+
+        # Dirty-region tracking: the grid area and the sidebar are redrawn only when their state changes
+        self.dirty = DirtyRegions()
+        # Starts below the 2px line that closes the top bar
+        self.grid_area_rect = pygame.Rect(0, self.top_bar_rect.bottom + 2, self.sidebar_x, WINDOW_HEIGHT - self.top_bar_rect.bottom - 2)
 
-        # Game variables
-        self.board = board if board is not None else BoardModel()
         self.on_start_game_cb = on_start_game
         self.running = True
 
     # Screen protocol methods
     def on_enter(self) -> None:
         pygame.display.set_caption("Batalha Naval - p2p")
+        self.dirty.invalidate()
+
+    def invalidate(self) -> None:
+        self.dirty.invalidate()
 
     def on_exit(self) -> None:
         pass
@@ -97,6 +117,13 @@ class PlacementScreen(Screen):
             if event.key == pygame.K_l:
                 self.on_toggle_orient()
                 return
+        if event.type == pygame.MOUSEWHEEL:
+            # Scroll the ship list (large fleets)
+            if self.list_view_rect.collidepoint(pygame.mouse.get_pos()):
+                content_h = len(self.board.ship_types) * SHIP_ROW_STEP + 10
+                max_scroll = max(0, content_h - self.list_view_rect.height)
+                self.list_scroll = max(0, min(max_scroll, self.list_scroll - event.y * SHIP_ROW_STEP))
+            return
         if event.type == pygame.MOUSEBUTTONDOWN:
             # Ensure start button rect is positioned before handling clicks
             self.btn_start.rect.topleft = (self.sidebar_x + 16, self.sidebar_rect.bottom - 56)
@@ -109,10 +136,9 @@ class PlacementScreen(Screen):
 
             # Ship list clicks (left button)
             if event.button == 1:
-                for st in SHIP_TYPES:
-                    rr = self.ship_row_rects.get(st.key)
-                    if rr and rr.collidepoint(event.pos):
-                        self.board.set_selected_ship(st.key)
+                for key, rr in self.ship_row_rects.items():
+                    if rr.collidepoint(event.pos):
+                        self.board.set_selected_ship(key)
                         return
                 # Grid click placement
                 gcoords = self.grid_coords_from_pos(event.pos)
@@ -129,8 +155,20 @@ class PlacementScreen(Screen):
                     return
 
     def render(self, surface) -> None:
-        surface.fill(theme.COLOR_BG)
         mouse_pos = pygame.mouse.get_pos()
+        changed = self.dirty.take_changed()
+        if changed is not None:
+            # Só as regiões que mudaram (ver dirty_rects); a barra do topo não muda nesta tela
+            draws = {
+                "grid": (self.grid_area_rect, lambda: self.draw_grid(surface, mouse_pos)),
+                "sidebar": (self.sidebar_rect, lambda: self.draw_sidebar(surface, mouse_pos)),
+            }
+            for name in changed:
+                rect, draw = draws[name]
+                draw_clipped(surface, rect, theme.COLOR_BG, draw)
+            return
+
+        surface.fill(theme.COLOR_BG)
 
         # Top bar
         self.draw_top_bar(surface)
@@ -141,6 +179,18 @@ class PlacementScreen(Screen):
         # Sidebar (buttons + title + list + start button if ready)
         self.draw_sidebar(surface, mouse_pos)
 
+    def dirty_rects(self) -> Optional[List[pygame.Rect]]:
+        mouse_pos = pygame.mouse.get_pos()
+        board = self.board
+        preview = self.grid_coords_from_pos(mouse_pos) if board.selected_ship_key else None
+        regions = {
+            "grid": (self.grid_area_rect, (tuple(board.ship_masks.items()), board.selected_ship_key,
+                                           board.current_orient, preview)),
+            "sidebar": (self.sidebar_rect, (board.selected_ship_key, tuple(board.placements), self.list_scroll,
+                                            self.btn_orient.label, hover_state(self.sidebar_rect, mouse_pos))),
+        }
+        return self.dirty.collect(regions)
+
     # Button callbacks
     def on_random(self):
         self.board.randomize()
@@ -174,29 +224,20 @@ class PlacementScreen(Screen):
                                 (40, 60, 100), (20, 30, 50))
         pygame.draw.line(surface, theme.COLOR_PANEL_BORDER, (0, self.top_bar_rect.bottom), (WINDOW_WIDTH, self.top_bar_rect.bottom), 2)
         title = "Batalha Naval - Escolher posições"
-        title_surf = self.title_font.render(title, True, theme.COLOR_TITLE)
+        title_surf = theme.render_text(self.title_font, title, theme.COLOR_TITLE)
         surface.blit(title_surf, (MARGIN, 20))
 
     def draw_grid(self, surface, mouse_pos):
-        # grid background
-        theme.draw_rounded_rect(surface, theme.COLOR_PANEL_BG, self.grid_rect, radius=8, border=theme.COLOR_PANEL_BORDER)
-        # cells
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                cell_rect = pygame.Rect(self.grid_x + x * self.cell + 1, self.grid_y + y * self.cell + 1, self.cell - 2, self.cell - 2)
-                base_color = theme.COLOR_WATER_ALT if (x + y) % 2 else theme.COLOR_WATER
-                pygame.draw.rect(surface, base_color, cell_rect, border_radius=6)
-                pygame.draw.rect(surface, theme.COLOR_GRID, cell_rect, 1, border_radius=6)
+        # grid background, cells and axis labels (cached)
+        n = self.board.grid_size
+        self.grid_base.render(surface, self.small_font, self.grid_x, self.grid_y, n, self.cell)
 
         # draw placed ships
-        for st in SHIP_TYPES:
+        for st in self.board.ship_types:
             pl = self.board.placements.get(st.key)
             if not pl:
                 continue
-            for (x, y) in pl.cells:
-                rect = pygame.Rect(self.grid_x + x * self.cell + 1, self.grid_y + y * self.cell + 1, self.cell - 2, self.cell - 2)
-                pygame.draw.rect(surface, st.color, rect, border_radius=6)
-                pygame.draw.rect(surface, theme.COLOR_GRID_ACCENT, rect, 2, border_radius=6)
+            grid_view.draw_ship(surface, self.grid_x, self.grid_y, self.cell, pl, st.color)
 
         # preview placement
         if self.board.selected_ship_key:
@@ -204,18 +245,18 @@ class PlacementScreen(Screen):
             if grid_coords:
                 px, py = grid_coords
                 valid, cells = self.board.get_preview_cells(px, py, self.board.selected_ship_key)
-                for (x, y) in cells:
-                    rect = pygame.Rect(self.grid_x + x * self.cell + 2, self.grid_y + y * self.cell + 2, self.cell - 4, self.cell - 4)
-                    color = theme.COLOR_VALID if valid else theme.COLOR_INVALID
-                    pygame.draw.rect(surface, color, rect, 3, border_radius=8)
-
-        # axis labels
-        axis_font = self.small_font
-        for i in range(GRID_SIZE):
-            xs = axis_font.render(str(i), True, theme.COLOR_TEXT_MUTED)
-            ys = axis_font.render(str(i), True, theme.COLOR_TEXT_MUTED)
-            surface.blit(xs, (self.grid_x + i * self.cell + self.cell // 2 - xs.get_width() // 2, self.grid_y - 18))
-            surface.blit(ys, (self.grid_x - 18, self.grid_y + i * self.cell + self.cell // 2 - ys.get_height() // 2))
+                color = theme.COLOR_VALID if valid else theme.COLOR_INVALID
+                if self.cell >= grid_view.DETAIL_CELL_PX:
+                    for (x, y) in cells:
+                        rect = pygame.Rect(self.grid_x + x * self.cell + 2, self.grid_y + y * self.cell + 2, self.cell - 4, self.cell - 4)
+                        pygame.draw.rect(surface, color, rect, 3, border_radius=8)
+                elif cells:
+                    # Small cells: one outline around the whole ship
+                    xs = [x for x, _ in cells]
+                    ys = [y for _, y in cells]
+                    rect = pygame.Rect(self.grid_x + min(xs) * self.cell, self.grid_y + min(ys) * self.cell,
+                                       (max(xs) - min(xs) + 1) * self.cell, (max(ys) - min(ys) + 1) * self.cell)
+                    pygame.draw.rect(surface, color, rect, 2)
 
     def draw_sidebar(self, surface, mouse_pos):
         theme.draw_rounded_rect(surface, theme.COLOR_PANEL_BG, self.sidebar_rect, radius=12, border=theme.COLOR_PANEL_BORDER)
@@ -226,7 +267,7 @@ class PlacementScreen(Screen):
         self.btn_orient.draw(surface, self.list_font, mouse_pos)
 
         # title "Embarcações"
-        title_surf = self.list_font.render("Embarcações", True, theme.COLOR_TITLE)
+        title_surf = theme.render_text(self.list_font, "Embarcações", theme.COLOR_TITLE)
         title_y = self.btn_orient.rect.bottom + 16
         surface.blit(title_surf, (self.sidebar_x + 16, title_y))
 
@@ -247,12 +288,18 @@ class PlacementScreen(Screen):
         pygame.draw.rect(surface, (24, 28, 40), list_rect, border_radius=8)
         pygame.draw.rect(surface, theme.COLOR_PANEL_BORDER, list_rect, 1, border_radius=8)
 
-        # list items
+        # list items (clipped to the list box; scrolled with the mouse wheel)
+        self.list_view_rect = list_rect
         self.ship_row_rects.clear()
-        available_y = list_rect.y + 10
-        for st in SHIP_TYPES:
-            placed = st.key in self.board.placements
+        prev_clip = surface.get_clip()
+        surface.set_clip(list_rect.inflate(-2, -2))
+        available_y = list_rect.y + 10 - self.list_scroll
+        for st in self.board.ship_types:
             row_rect = pygame.Rect(list_rect.x + 10, available_y, list_rect.width - 20, 44)
+            available_y += SHIP_ROW_STEP
+            if row_rect.bottom < list_rect.y or row_rect.y > list_rect.bottom:
+                continue
+            placed = st.key in self.board.placements
             hover = row_rect.collidepoint(mouse_pos)
             bg = (36, 42, 60) if not hover else (44, 52, 72)
             theme.draw_rounded_rect(surface, bg, row_rect, radius=10)
@@ -263,16 +310,16 @@ class PlacementScreen(Screen):
             chip = pygame.Rect(row_rect.x + 8, row_rect.y + 8, 28, 28)
             theme.draw_rounded_rect(surface, st.color, chip, radius=6)
 
-            name_surf = self.list_font.render(st.name, True, theme.COLOR_TEXT)
-            size_surf = self.small_font.render(f"{st.size} posições", True, theme.COLOR_TEXT_MUTED)
+            name_surf = theme.render_text(self.list_font, st.name, theme.COLOR_TEXT)
+            size_surf = theme.render_text(self.small_font, f"{st.size} posições", theme.COLOR_TEXT_MUTED)
             surface.blit(name_surf, (chip.right + 10, row_rect.y + 6))
             surface.blit(size_surf, (chip.right + 12, row_rect.y + 24))
 
             if placed:
                 theme.draw_badge(surface, "OK", (row_rect.right - 48, row_rect.y + 12), font=self.small_font)
 
-            self.ship_row_rects[st.key] = row_rect
-            available_y += 52
+            self.ship_row_rects[st.key] = row_rect.clip(list_rect)
+        surface.set_clip(prev_clip)
 
     # placement helpers
     def place_selected_at(self, gx: int, gy: int):
@@ -3,6 +3,7 @@ from typing import List, Optional
 import app.pygame_ui.ui_core.theme as theme
 from app.pygame_ui.ui_core.screen import Screen
 from app.naval_battle.player_model import Player
+from app.network.shared_players import SharedPlayersTable
 
 
 class PlayersScreen(Screen):
@@ -20,6 +21,12 @@ class PlayersScreen(Screen):
         # Estado
         self.running = True
         self.pad = 12
+        # Redesenha apenas quando algo mudou
+        self.dirty = True
+
+        # Tabela em memória compartilhada (opcional) e última sequência lida
+        self.table: Optional[SharedPlayersTable] = None
+        self.table_seq = -1
 
     def on_enter(self) -> None:
         try:
@@ -34,13 +41,25 @@ class PlayersScreen(Screen):
         # Permite que o App trate o QUIT, mas também encerra o ciclo interno desta tela
         if event.type == pygame.QUIT:
             self.running = False
+        elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESIZED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE):
+            self.dirty = True
 
     def update(self, dt: float) -> None:
-        # Update players
-        pass
+        # Lê a tabela compartilhada apenas quando a sequência mudou
+        if self.table is None:
+            return
+        seq = self.table.sequence()
+        if seq == self.table_seq or seq % 2:
+            return
+        seq, rows = self.table.read()
+        if seq < 0:
+            return
+        self.table_seq = seq
+        self.set_players([Player(ip, active, last_seen, score) for ip, active, score, last_seen in rows])
 
     def render(self, surface) -> None:
         # Adapta layout ao tamanho do surface (funciona tanto na janela principal quanto em janela dedicada)
+        self.dirty = False
         width, height = surface.get_width(), surface.get_height()
         surface.fill(theme.COLOR_BG)
 
@@ -55,7 +74,7 @@ class PlayersScreen(Screen):
             (20, 30, 50),
         )
         pygame.draw.rect(surface, theme.COLOR_PANEL_BORDER, title_bar_rect, width=1, border_radius=8)
-        title_surf = self.title_font.render("Lista de Jogadores", True, theme.COLOR_TITLE)
+        title_surf = theme.render_text(self.title_font, "Lista de Jogadores", theme.COLOR_TITLE)
         surface.blit(title_surf, (title_bar_rect.x + 10, title_bar_rect.y + 8))
 
         # Painel base (usa o mesmo tema das demais telas)
@@ -74,6 +93,9 @@ class PlayersScreen(Screen):
             dot_color = (46, 204, 113) if is_active else (200, 40, 40)
             ip_text = getattr(p, "ip", "")
             status_text = "ativo" if is_active else "inativo"
+            score = getattr(p, "score", 0)
+            if score:
+                status_text += f", {score} acerto(s)"
 
             # Sufixo: "(Eu)" se IP local; caso contrário "Jogador N"
             if ip_text in self.local_ips:
@@ -83,9 +105,9 @@ class PlayersScreen(Screen):
                 non_self_counter += 1
 
             ip_label = f"{ip_text}{suffix}"
-            ip_surf = self.item_font.render(ip_label, True, theme.COLOR_TEXT)
+            ip_surf = theme.render_text(self.item_font, ip_label, theme.COLOR_TEXT)
             st_color = (200, 40, 40) if not is_active else theme.COLOR_TEXT_MUTED
-            st_surf = self.small_font.render(f"({status_text})", True, st_color)
+            st_surf = theme.render_text(self.small_font, f"({status_text})", st_color)
 
             # Ponto de status como círculo, alinhado ao meio da altura do texto
             dot_x = panel_rect.x + 16
@@ -100,3 +122,8 @@ class PlayersScreen(Screen):
     # Atualiza a lista de jogadores dinamicamente
     def set_players(self, players: Optional[List[Player]]) -> None:
         self.players = list(players or [])
+        self.dirty = True
+
+    def set_table(self, table: Optional[SharedPlayersTable]) -> None:
+        self.table = table
+        self.table_seq = -1
@@ -18,7 +18,7 @@ class Button:
             radius=self.style.radius,
             border=self.style.border,
         )
-        text_surf = font.render(self.label, True, self.style.text)
+        text_surf = theme.render_text(font, self.label, self.style.text)
         tx = self.rect.centerx - text_surf.get_width() // 2
         ty = self.rect.centery - text_surf.get_height() // 2
         surface.blit(text_surf, (tx, ty))
@@ -0,0 +1,46 @@
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+import pygame
+
+_MISSING = object()
+
+
+class DirtyRegions:
+    # Guarda o último estado desenhado de cada região da tela. A cada frame a tela descreve suas
+    # regiões como (retângulo, estado); só as regiões cujo estado mudou voltam como retângulos sujos.
+    def __init__(self) -> None:
+        self.states: Dict[str, Hashable] = {}
+        self.full = True
+        # Nomes das regiões mudadas no último collect (None = tela inteira), consumidos pelo render
+        self.changed: Optional[Set[str]] = None
+
+    def invalidate(self) -> None:
+        # Próximo collect pede a tela inteira (entrada na tela, janela exposta, modal)
+        self.full = True
+
+    def collect(self, regions: Dict[str, Tuple[pygame.Rect, Hashable]]) -> Optional[List[pygame.Rect]]:
+        changed = [name for name, (_, state) in regions.items() if self.states.get(name, _MISSING) != state]
+        self.states = {name: state for name, (_, state) in regions.items()}
+        if self.full:
+            self.full = False
+            self.changed = None
+            return None
+        self.changed = set(changed)
+        return [regions[name][0] for name in changed]
+
+    def take_changed(self) -> Optional[Set[str]]:
+        # Regiões a redesenhar neste frame; render sem collect antes desenha a tela inteira
+        changed, self.changed = self.changed, None
+        return changed
+
+
+def draw_clipped(surface, rect: pygame.Rect, background, draw: Callable[[], None]) -> None:
+    # Redesenha só dentro de `rect`: o resto do back buffer fica como estava no frame anterior
+    surface.set_clip(rect)
+    surface.fill(background, rect)
+    draw()
+    surface.set_clip(None)
+
+
+def hover_state(rect: pygame.Rect, mouse_pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    # Posição do mouse só quando ele está sobre a região (hover muda o desenho); fora dela, None
+    return mouse_pos if rect.collidepoint(mouse_pos) else None
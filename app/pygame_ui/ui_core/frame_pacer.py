@@ -0,0 +1,72 @@
+import time
+from typing import List
+import pygame
+
+# Ritmo dos frames: cheio durante a interação, baixo sem entrada nem eventos de rede, mais baixo sem foco
+ACTIVE_FPS = 60
+IDLE_FPS = 10
+BACKGROUND_FPS = 4
+# Segundos em ritmo cheio após a última entrada (mouse, teclado, foco)
+ACTIVE_HOLD = 0.5
+
+# Evento postado por outras threads (rede) só para acordar o loop ocioso; nunca chega às telas
+WAKE_EVENT = pygame.event.custom_type()
+
+INPUT_EVENTS = frozenset((
+    pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+    pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.WINDOWFOCUSGAINED, pygame.WINDOWENTER,
+))
+
+
+class FramePacer:
+    # Substitui o clock.tick(fps) fixo: em ritmo ocioso o loop dorme em event.wait e acorda na hora
+    # com entrada do usuário ou com wake() (dados chegando nos sockets); o dt continua sendo medido
+    def __init__(self, active_fps: int = ACTIVE_FPS, idle_fps: int = IDLE_FPS,
+                 background_fps: int = BACKGROUND_FPS) -> None:
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.background_fps = background_fps
+        self.clock = pygame.time.Clock()
+        self.last_input = time.monotonic()
+        self.focused = True
+        self.wake_pending = False
+        self.dt = 0.0
+
+    def wait(self, busy: bool = False) -> List[pygame.event.Event]:
+        # Espera o próximo frame e devolve os eventos pendentes; `busy` força o ritmo cheio
+        if busy or time.monotonic() - self.last_input < ACTIVE_HOLD:
+            self.clock.tick(self.active_fps)
+            self.wake_pending = False
+            events = pygame.event.get()
+        else:
+            fps = self.idle_fps if self.focused else self.background_fps
+            first = pygame.event.wait(1000 // fps)
+            self.wake_pending = False
+            events = pygame.event.get()
+            if first.type != pygame.NOEVENT:
+                events.insert(0, first)
+            self.clock.tick()
+        self.dt = self.clock.get_time() / 1000.0
+
+        pending: List[pygame.event.Event] = []
+        for event in events:
+            if event.type == WAKE_EVENT:
+                continue
+            if event.type in INPUT_EVENTS:
+                self.last_input = time.monotonic()
+            if event.type == pygame.WINDOWFOCUSGAINED:
+                self.focused = True
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                self.focused = False
+            pending.append(event)
+        return pending
+
+    def wake(self) -> None:
+        # Pode ser chamado de qualquer thread; no máximo um WAKE_EVENT na fila por vez
+        if self.wake_pending:
+            return
+        self.wake_pending = True
+        try:
+            pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        except pygame.error:
+            self.wake_pending = False
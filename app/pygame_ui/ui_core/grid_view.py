@@ -0,0 +1,163 @@
+import pygame
+from typing import Callable, Dict, Tuple
+from app.pygame_ui.ui_core import theme
+from app.naval_battle.bitboard import iter_cells
+from app.naval_battle.placement import Placement
+from app.pygame_ui.constants import ORIENT_H
+
+# Abaixo deste tamanho de célula o tabuleiro é desenhado como água + linhas (tabuleiros grandes),
+# sem um retângulo arredondado por célula
+DETAIL_CELL_PX = 16
+AXIS_STEPS = (1, 2, 5, 10, 20, 25, 50)
+
+
+def cell_size_for(n: int, width: int, height: int, minimum: int = 4) -> int:
+    return max(minimum, min(width // n, height // n))
+
+
+def axis_step(cell: int, label_px: int = 22) -> int:
+    # Menor passo "redondo" que mantém os rótulos dos eixos sem sobreposição
+    for step in AXIS_STEPS:
+        if step * cell >= label_px:
+            return step
+    return AXIS_STEPS[-1]
+
+
+def draw_water(surface, grid_x: int, grid_y: int, n: int, cell: int) -> None:
+    if cell >= DETAIL_CELL_PX:
+        for y in range(n):
+            for x in range(n):
+                cell_rect = pygame.Rect(grid_x + x * cell + 1, grid_y + y * cell + 1, cell - 2, cell - 2)
+                base_color = theme.COLOR_WATER_ALT if (x + y) % 2 else theme.COLOR_WATER
+                pygame.draw.rect(surface, base_color, cell_rect, border_radius=6)
+                pygame.draw.rect(surface, theme.COLOR_GRID, cell_rect, 1, border_radius=6)
+        return
+    # Tabuleiro grande: um preenchimento e 2n linhas
+    size = n * cell
+    surface.fill(theme.COLOR_WATER, pygame.Rect(grid_x, grid_y, size, size))
+    for i in range(n + 1):
+        pygame.draw.line(surface, theme.COLOR_WATER_ALT, (grid_x + i * cell, grid_y), (grid_x + i * cell, grid_y + size))
+        pygame.draw.line(surface, theme.COLOR_WATER_ALT, (grid_x, grid_y + i * cell), (grid_x + size, grid_y + i * cell))
+
+
+def draw_axes(surface, font, grid_x: int, grid_y: int, n: int, cell: int) -> None:
+    for i in range(0, n, axis_step(cell)):
+        xs = theme.render_text(font, str(i), theme.COLOR_TEXT_MUTED)
+        ys = theme.render_text(font, str(i), theme.COLOR_TEXT_MUTED)
+        surface.blit(xs, (grid_x + i * cell + cell // 2 - xs.get_width() // 2, grid_y - 18))
+        # Rótulos largos (dois ou três dígitos) ficam alinhados à direita junto ao tabuleiro
+        ys_x = min(grid_x - 18, grid_x - 6 - ys.get_width())
+        surface.blit(ys, (ys_x, grid_y + i * cell + cell // 2 - ys.get_height() // 2))
+
+
+class GridBase:
+    # Parte estática de um tabuleiro (painel, água, linhas e rótulos dos eixos) desenhada uma vez numa
+    # Surface e colada com um blit por frame; refeita só quando tamanho, célula, fonte ou tema mudam
+    def __init__(self) -> None:
+        self.key = None
+        self.surface: pygame.Surface | None = None
+        self.origin = (0, 0)
+
+    def render(self, surface, font, grid_x: int, grid_y: int, n: int, cell: int) -> None:
+        key = (n, cell, id(font), theme.theme_version)
+        if key != self.key:
+            self.key = key
+            self.build(font, n, cell)
+        surface.blit(self.surface, (grid_x - self.origin[0], grid_y - self.origin[1]))
+
+    def build(self, font, n: int, cell: int) -> None:
+        # Margens para os rótulos: 18px acima e à esquerda, mais se o maior número for largo
+        left = max(18, 6 + font.size(str(n - 1))[0])
+        top = 18
+        size = n * cell
+        base = pygame.Surface((left + size, top + size), pygame.SRCALPHA)
+        theme.draw_rounded_rect(base, theme.COLOR_PANEL_BG, pygame.Rect(left, top, size, size), radius=8,
+                                border=theme.COLOR_PANEL_BORDER)
+        draw_water(base, left, top, n, cell)
+        draw_axes(base, font, left, top, n, cell)
+        self.surface = base.convert_alpha() if pygame.display.get_surface() is not None else base
+        self.origin = (left, top)
+
+
+def ship_rect(grid_x: int, grid_y: int, cell: int, placement: Placement) -> pygame.Rect:
+    # Retângulo único cobrindo todas as células do navio
+    sx, sy = placement.start
+    w = placement.size if placement.orient == ORIENT_H else 1
+    h = 1 if placement.orient == ORIENT_H else placement.size
+    return pygame.Rect(grid_x + sx * cell + 1, grid_y + sy * cell + 1, w * cell - 2, h * cell - 2)
+
+
+def draw_ship(surface, grid_x: int, grid_y: int, cell: int, placement: Placement, color) -> None:
+    if cell >= DETAIL_CELL_PX:
+        for (x, y) in placement.cells:
+            rect_cell = pygame.Rect(grid_x + x * cell + 1, grid_y + y * cell + 1, cell - 2, cell - 2)
+            pygame.draw.rect(surface, color, rect_cell, border_radius=6)
+            pygame.draw.rect(surface, theme.COLOR_GRID_ACCENT, rect_cell, 2, border_radius=6)
+        return
+    pygame.draw.rect(surface, color, ship_rect(grid_x, grid_y, cell, placement))
+
+
+class MaskLayer:
+    # Camada transparente do tamanho do tabuleiro com as células de um bitboard (tiros, acertos).
+    # Só as células novas desde o último sync são desenhadas; a cada frame basta um blit.
+    def __init__(self, n: int, cell: int, draw_cell: Callable[[pygame.Surface, pygame.Rect], None]) -> None:
+        self.n = n
+        self.cell = cell
+        self.draw_cell = draw_cell
+        self.surface = pygame.Surface((n * cell, n * cell), pygame.SRCALPHA)
+        self.drawn = 0
+
+    def sync(self, mask: int) -> None:
+        if self.drawn & ~mask:
+            # Células saíram da máscara: redesenha do zero
+            self.surface.fill((0, 0, 0, 0))
+            self.drawn = 0
+        for x, y in iter_cells(mask & ~self.drawn, self.n):
+            self.draw_cell(self.surface, pygame.Rect(x * self.cell, y * self.cell, self.cell, self.cell))
+        self.drawn = mask
+
+    def blit(self, surface, pos: Tuple[int, int]) -> None:
+        surface.blit(self.surface, pos)
+
+
+class HeatLayer:
+    # Mapa de calor dos acertos (célula -> quantos oponentes foram atingidos nela); redesenhado
+    # inteiro só quando a versão muda, e a intensidade é relativa à maior contagem
+    def __init__(self, n: int, cell: int) -> None:
+        self.n = n
+        self.cell = cell
+        self.surface = pygame.Surface((n * cell, n * cell), pygame.SRCALPHA)
+        self.version = -1
+
+    def sync(self, version: int, counts: Callable[[], Dict[Tuple[int, int], int]]) -> None:
+        if version == self.version:
+            return
+        self.version = version
+        self.surface.fill((0, 0, 0, 0))
+        counts_by_cell = counts()
+        top = max(counts_by_cell.values(), default=0)
+        for (x, y), count in counts_by_cell.items():
+            alpha = 90 + 165 * count // top
+            rect = pygame.Rect(x * self.cell, y * self.cell, self.cell, self.cell).inflate(-2, -2)
+            pygame.draw.rect(self.surface, (200, 40, 40, alpha), rect, border_radius=6 if self.cell >= DETAIL_CELL_PX else 0)
+
+    def blit(self, surface, pos: Tuple[int, int]) -> None:
+        surface.blit(self.surface, pos)
+
+
+def draw_miss(surface, rect: pygame.Rect) -> None:
+    pygame.draw.rect(surface, (110, 114, 120), rect.inflate(-2, -2), border_radius=6 if rect.width >= DETAIL_CELL_PX else 0)
+
+
+def draw_hit_fill(surface, rect: pygame.Rect) -> None:
+    pygame.draw.rect(surface, (200, 40, 40), rect.inflate(-2, -2), border_radius=6 if rect.width >= DETAIL_CELL_PX else 0)
+
+
+def draw_hit_cross(surface, rect: pygame.Rect) -> None:
+    if rect.width < DETAIL_CELL_PX:
+        draw_hit_fill(surface, rect)
+        return
+    x0, y0 = rect.x + 4, rect.y + 4
+    x1, y1 = rect.right - 4, rect.bottom - 4
+    pygame.draw.line(surface, (200, 40, 40), (x0, y0), (x1, y1), 3)
+    pygame.draw.line(surface, (200, 40, 40), (x0, y1), (x1, y0), 3)
@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import List, Optional, Protocol
 
 class Screen(Protocol):
     def handle_event(self, event) -> None:
@@ -12,3 +12,13 @@ class Screen(Protocol):
 
     def on_exit(self) -> None:
         ...
+
+    def dirty_rects(self) -> Optional[List]:
+        # Regiões que mudaram desde o último render: None = tela inteira, [] = nada a redesenhar.
+        # Telas sem este método são redesenhadas inteiras a cada frame.
+        ...
+
+    def invalidate(self) -> None:
+        # Conteúdo da janela perdido: o próximo dirty_rects/render cobre a tela inteira.
+        # Opcional, como dirty_rects
+        ...
@@ -1,10 +1,12 @@
-from typing import Optional
+from typing import List, Optional
 from app.pygame_ui.ui_core.screen import Screen
 
 class ScreenManager:
     def __init__(self, initial: Screen, initial_name: Optional[str] = None) -> None:
         self.current: Screen = initial
         self.current_name: Optional[str] = initial_name
+        # Força um redesenho completo (troca de tela, janela exposta)
+        self.full_redraw = True
         # Notifica que a tela atual foi ativada
         try:
             self.current.on_enter()
@@ -21,7 +23,24 @@ class ScreenManager:
         # Entra na nova tela
         self.current = next_screen
         self.current_name = next_name
+        self.full_redraw = True
         try:
             self.current.on_enter()
         except Exception:
             pass
+
+    def invalidate(self) -> None:
+        self.full_redraw = True
+        # A tela também precisa saber: senão o render repinta só as regiões do último collect
+        invalidate = getattr(self.current, "invalidate", None)
+        if callable(invalidate):
+            invalidate()
+
+    def dirty_rects(self) -> Optional[List]:
+        # None = redesenhar e atualizar a tela inteira; [] = frame ocioso
+        dirty_rects = getattr(self.current, "dirty_rects", None)
+        rects = dirty_rects() if callable(dirty_rects) else None
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+        return rects
@@ -1,5 +1,7 @@
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Callable, Tuple
+import numpy as np
 import pygame
 
 # Paleta base 
@@ -23,13 +25,19 @@ COLOR_BUTTON_TEXT = (245, 247, 250)
 COLOR_BADGE = (34, 139, 34)  #
 COLOR_BADGE_TEXT = (255, 255, 255)
 
-# Cores para navios (Porta-aviões, Bombardeiro, Submarino, Lancha militar)
-SHIP_COLORS = [
-    (252, 163, 17),   # laranja quente
-    (59, 130, 246),   # azul
-    (16, 185, 129),   # verde
-    (236, 72, 153),   # rosa
-]
+# Cores para navios: definidas em constants (sem pygame) para o modo headless
+from app.pygame_ui.constants import SHIP_COLORS
+
+# Incrementada quando a paleta muda: caches de superfícies guardam a versão com que foram desenhados
+theme_version = 0
+
+
+def bump_theme_version() -> None:
+    global theme_version
+    theme_version += 1
+    text_cache.clear()
+    shape_cache.clear()
+
 
 HIT_COLOR = (220, 40, 40)
 MISS_COLOR = (120, 180, 230)
@@ -53,28 +61,106 @@ def load_font(name: str = "consolas", size: int = 18, bold: bool = False):
         return None
 
 
+# Caches LRU de Surfaces prontas, com contadores de acertos:
+# - textos: (fonte, texto, cor, antialias); rótulos, eixos e placares repetem as mesmas strings a cada frame
+# - formas: degradês e retângulos arredondados por (tamanho, cores, raio); painéis e botões mudam pouco
+TEXT_CACHE_SIZE = 512
+SHAPE_CACHE_SIZE = 256
+
+
+class SurfaceCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, build: Callable[[], pygame.Surface]) -> pygame.Surface:
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = build()
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"hits={self.hits} misses={self.misses} ({rate:.1f}% hits), {len(self.entries)} entradas"
+
+
+text_cache = SurfaceCache(TEXT_CACHE_SIZE)
+shape_cache = SurfaceCache(SHAPE_CACHE_SIZE)
+
+
+def render_text(font, text: str, color, antialias: bool = True) -> pygame.Surface:
+    # A Surface devolvida é compartilhada: só blit, nunca desenhar nela
+    return text_cache.get((font, text, tuple(color), antialias), lambda: font.render(text, antialias, color))
+
+
+def _display_format(surf: pygame.Surface, alpha: bool) -> pygame.Surface:
+    # Converte para o formato da janela (blit mais rápido) quando já existe uma
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+
+def rounded_rect_surface(size: Tuple[int, int], color, radius: int = 8,
+                         border: Tuple[int, int, int] | None = None) -> pygame.Surface:
+    def build() -> pygame.Surface:
+        shape_surf = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(shape_surf, color, (0, 0, *size), border_radius=radius)
+        if border:
+            pygame.draw.rect(shape_surf, border, (0, 0, *size), width=1, border_radius=radius)
+        return _display_format(shape_surf, True)
+    key = ("rounded", tuple(size), tuple(color), radius, tuple(border) if border else None)
+    return shape_cache.get(key, build)
+
+
 def draw_rounded_rect(surface, color, rect, radius: int = 8, border: Tuple[int, int, int] | None = None):
-    shape_surf = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(shape_surf, color, (0, 0, *rect.size), border_radius=radius)
-    surface.blit(shape_surf, rect.topleft)
-    if border:
-        pygame.draw.rect(surface, border, rect, width=1, border_radius=radius)
+    rect = pygame.Rect(rect)
+    surface.blit(rounded_rect_surface(rect.size, color, radius, border), rect.topleft)
+
+
+def gradient_surface(size: Tuple[int, int], top_color, bottom_color) -> pygame.Surface:
+    def build() -> pygame.Surface:
+        w, h = size
+        # Uma rampa de cores por linha, replicada em todas as colunas e copiada de uma vez (surfarray)
+        ratio = np.arange(h, dtype=np.float64)[:, None] / max(h - 1, 1)
+        ramp = np.asarray(top_color, dtype=np.float64) * (1 - ratio) + np.asarray(bottom_color, dtype=np.float64) * ratio
+        pixels = np.broadcast_to(ramp.astype(np.uint8)[None, :, :], (w, h, 3))
+        grad = pygame.Surface(size)
+        pygame.surfarray.blit_array(grad, pixels)
+        return _display_format(grad, False)
+    return shape_cache.get(("gradient", tuple(size), tuple(top_color), tuple(bottom_color)), build)
+
+
+def overlay_surface(size: Tuple[int, int], color) -> pygame.Surface:
+    # Véu translúcido (RGBA) para escurecer a tela atrás de modais
+    def build() -> pygame.Surface:
+        veil = pygame.Surface(size, pygame.SRCALPHA)
+        veil.fill(color)
+        return _display_format(veil, True)
+    return shape_cache.get(("overlay", tuple(size), tuple(color)), build)
 
 
 def vertical_gradient(surface, rect, top_color, bottom_color):
     x, y, w, h = rect
-    for i in range(h):
-        ratio = i / max(h - 1, 1)
-        r = int(top_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-        g = int(top_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-        b = int(top_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-        pygame.draw.line(surface, (r, g, b), (x, y + i), (x + w, y + i))
+    surface.blit(gradient_surface((w, h), top_color, bottom_color), (x, y))
 
 
 def draw_badge(surface, text: str, pos: Tuple[int, int], font=None):
     if font is None:
         font = load_font(size=14, bold=True)
-    text_surf = font.render(text, True, COLOR_BADGE_TEXT)
+    text_surf = render_text(font, text, COLOR_BADGE_TEXT)
     pad_x, pad_y = 8, 4
     rect = text_surf.get_rect()
     badge_rect = pygame.Rect(pos[0], pos[1], rect.width + pad_x * 2, rect.height + pad_y * 2)
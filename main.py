@@ -1,7 +1,62 @@
-from app.app import App
+import argparse
+import contextlib
+import os
+from app.network import interfaces
+from app.network.p2p_tcp import DEFAULT_TCP_PORT
+from app.network.p2p_udp import DEFAULT_UDP_PORT
+from app.naval_battle.match_config import MatchConfig, MatchConfigError
+from app.pygame_ui.constants import GRID_SIZE
 
 def main() -> None:
-    app = App()
+    parser = argparse.ArgumentParser(description="Batalha Naval p2p")
+    parser.add_argument("--bind", default=None, help="IP da interface de rede a usar (padrão: detectar)")
+    parser.add_argument("--udp-port", type=int, default=DEFAULT_UDP_PORT, help="porta UDP própria (0 = qualquer)")
+    parser.add_argument("--tcp-port", type=int, default=DEFAULT_TCP_PORT, help="porta TCP própria (0 = qualquer)")
+    parser.add_argument("--loopback", type=int, default=0, metavar="N",
+                        help="modo de teste local: N instâncias em 127.0.0.1..N, descoberta por unicast")
+    parser.add_argument("--instance", type=int, default=1, metavar="K",
+                        help="no modo loopback, número desta instância (usa 127.0.0.K)")
+    # Partida: tamanho do tabuleiro (N x N) e frota
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE, help="lado do tabuleiro (até 100)")
+    parser.add_argument("--fleet", default="", help="tamanhos dos navios separados por vírgula, ex.: 5,4,3,3,2")
+    # Modo headless (sem pygame): bots e servidores
+    parser.add_argument("--headless", action="store_true", help="roda sem janela, com tabuleiro aleatório")
+    parser.add_argument("--bots", type=int, default=1, help="headless: quantidade de bots neste processo (loopback)")
+    parser.add_argument("--shot-interval", type=float, default=10.0, help="headless: segundos entre tiros")
+    parser.add_argument("--duration", type=float, default=None, help="headless: encerra após N segundos")
+    parser.add_argument("--seed", type=int, default=None, help="headless: semente dos tabuleiros")
+    parser.add_argument("--quiet", action="store_true", help="headless: suprime o log por mensagem")
+    args = parser.parse_args()
+
+    try:
+        match_config = MatchConfig.parse(args.grid_size, args.fleet)
+    except MatchConfigError as e:
+        parser.error(str(e))
+
+    bind_addr = args.bind
+    discovery_targets = None
+    if args.loopback:
+        if not 1 <= args.instance <= args.loopback:
+            parser.error("--instance deve estar entre 1 e --loopback")
+        discovery_targets = interfaces.loopback_addresses(args.loopback)
+        bind_addr = discovery_targets[args.instance - 1]
+
+    if args.headless:
+        # Import tardio: o modo headless nunca carrega pygame
+        from app.headless import print_report, run_headless
+        quiet = open(os.devnull, "w") if args.quiet else None
+        with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+            peers = run_headless(bots=args.bots, bind_addr=bind_addr, udp_port=args.udp_port, tcp_port=args.tcp_port,
+                                 discovery_targets=discovery_targets, shot_interval=args.shot_interval,
+                                 duration=args.duration, seed=args.seed, match_config=match_config)
+        if quiet:
+            quiet.close()
+        print_report(peers)
+        return
+
+    from app.app import App
+    app = App(bind_addr=bind_addr, udp_port=args.udp_port, tcp_port=args.tcp_port,
+              discovery_targets=discovery_targets, match_config=match_config)
     app.run()
 
 if __name__ == "__main__":